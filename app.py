@@ -1,8 +1,15 @@
+import os
+import threading
+from collections import OrderedDict
 import streamlit as st
 import pandas as pd
-import networkx as nx
+import numpy as np
 import matplotlib.pyplot as plt
 import solver
+import result_cache
+import chain_render
+import robustness
+import dp_export
 
 # Page Config
 st.set_page_config(page_title="OptiRelief Logistics", layout="wide")
@@ -13,6 +20,8 @@ cost_land = st.sidebar.slider("Biaya Transport Darat (per Km)", 1000, 10000, 500
 cost_air = st.sidebar.slider("Biaya Transport Udara (per Km)", 10000, 100000, 50000, 5000)
 
 cost_multipliers = {'land': cost_land, 'air': cost_air}
+sweep_steps = st.sidebar.slider("Resolusi Sweep (titik per sumbu)", 3, 25, 10)
+solve_deadline = st.sidebar.number_input("Batas waktu solve (detik, 0 = tanpa batas)", 0.0, 600.0, 0.0, 0.5)
 
 # --- Data Loading ---
 @st.cache_data
@@ -27,163 +36,115 @@ df = load_data()
 st.title("🚁 OptiRelief: Disaster Logistics Chain Optimization")
 st.markdown("Optimization of multi-stage disaster relief distribution using **Dynamic Open-TSP** and **Backward Recursion**.")
 
+# --- Result Cache (lintas sesi, LRU + SQLite opsional) ---
+@st.cache_resource
+def get_result_cache():
+    max_mb = float(os.environ.get('OPTIRELIEF_CACHE_MB', 256))
+    db_mb = float(os.environ.get('OPTIRELIEF_CACHE_DB_MB', 1024))
+    max_age_h = os.environ.get('OPTIRELIEF_CACHE_MAX_AGE_H')
+    return result_cache.ResultCache(max_bytes=int(max_mb * 1024 * 1024),
+                                    sqlite_path=os.environ.get('OPTIRELIEF_CACHE_DB'),
+                                    max_disk_bytes=int(db_mb * 1024 * 1024),
+                                    max_age_s=float(max_age_h) * 3600 if max_age_h else None)
+
+# Solver lengkap (matriks N x N, tur lokal, tabel DP) hanya disimpan di memori proses ini, tidak dipickle;
+# dibatasi jumlah entri. ResultCache cukup menyimpan SolveSummary (hasil + array kecil untuk UI).
+LIVE_SOLVERS = int(os.environ.get('OPTIRELIEF_LIVE_SOLVERS', 4))
+
+@st.cache_resource
+def get_live_solvers():
+    return OrderedDict(), threading.Lock()
+
+@st.cache_data
+def get_dataset_hash(_df, path_mtime):
+    return result_cache.dataset_hash(_df)
+
+# Opsional: matriks jarak jalan (.npy float32, lihat road_matrix.py) untuk biaya darat
+road_matrix_path = os.environ.get('OPTIRELIEF_ROAD_MATRIX')
+
+def run_solver():
+    # Solve anytime: progress per stage + rute sementara ditampilkan selama rekursi / refine berjalan
+    instance = solver.LogisticsSolver(df, cost_multipliers=cost_multipliers, profile=True, road_matrix=road_matrix_path)
+    bar = st.progress(0.0, text="Menyusun tur lokal awal (greedy)..." if solve_deadline else "Menyusun tur lokal...")
+    partial = st.empty()
+    for event in instance.solve_iter(top_k=3, deadline_s=solve_deadline or None):
+        phase = {'draft': "Draft", 'refine': "Refine", 'solve': "Solve"}[event['phase']]
+        if event['event'] == 'stage_tours':
+            bar.progress(event['progress'], text=f"[{phase}] Tur lokal Stage {event['stage']} ({event['method']}) · {event['elapsed_s']:.2f}s")
+        elif event['event'] == 'stage_done':
+            bar.progress(event['progress'], text=f"[{phase}] Stage {event['stage']} selesai · cost-to-finish terbaik "
+                                                 f"Rp {event['best_cost_to_finish']:,.0f} · {event['elapsed_s']:.2f}s")
+        elif event['event'] == 'result' and event['results']:
+            best = event['results'][0]
+            partial.info(f"**Rute sementara ({phase}, {event['elapsed_s']:.2f}s): Rp {best['total_cost']:,.0f}**  \n"
+                         + " → ".join(node['nama_lokasi'] for node in best['full_path']))
+    bar.empty()
+    partial.empty()
+    if event['deadline_hit']:
+        st.warning(f"Batas waktu {solve_deadline:g}s tercapai: stage {event['refined_stages'] or '-'} sudah di-refine, "
+                   "stage lain memakai tur greedy (hasil best-effort).")
+    return instance, event['results']
+
+def remember_live_solver(key, instance):
+    live, lock = get_live_solvers()
+    with lock:
+        live[key] = instance
+        live.move_to_end(key)
+        while len(live) > LIVE_SOLVERS:
+            live.popitem(last=False)
+
+def get_live_solver():
+    # Solver untuk analisis lanjutan (depot, sweep, robustness). Jika ringkasan datang dari cache
+    # (mis. tier disk setelah restart) dan solver belum ada di proses ini, solve ulang sekali.
+    live, lock = get_live_solvers()
+    with lock:
+        instance = live.get(cache_key)
+    if instance is None:
+        instance, _ = run_solver()
+    remember_live_solver(cache_key, instance)
+    return instance
+
+def solve_summary():
+    instance, results = run_solver()
+    remember_live_solver(cache_key, instance)
+    return instance.summary(results)
+
 # 1. Group Data by Stage
 # 2. Run Optimization (Class-Based with Trace)
-# 2. Run Optimization (Class-Based with Trace)
-# Pass dynamic multipliers from sidebar
-solver_instance = solver.LogisticsSolver(df, cost_multipliers=cost_multipliers)
-top_k_solutions = solver_instance.get_recommendations(top_k=3)
+# Pass dynamic multipliers from sidebar (hasil diambil dari cache jika kombinasi sudah pernah dihitung)
+cache = get_result_cache()
+dataset_hash = get_dataset_hash(df, os.path.getmtime('data_lokasi_bencana.csv'))
+data_key = dataset_hash
+if road_matrix_path:
+    data_key = f"{data_key}:road:{road_matrix_path}:{os.path.getmtime(road_matrix_path)}"
+solve_key = f"{data_key}:deadline:{solve_deadline:g}" if solve_deadline else data_key
+cache_key = result_cache.make_key(solve_key, cost_multipliers, 3)
+summary = cache.get_or_compute(cache_key, solve_summary)
+top_k_solutions = summary.results
+
+cache_stats = cache.stats
+if summary.road_stats:
+    road = summary.road_stats
+    st.sidebar.caption(f"🛣️ Jarak darat dari matriks jalan: {road['road']:,}/{road['pairs']:,} pasangan "
+                       f"({road['fallback']:,} fallback haversine)")
+st.sidebar.caption(
+    f"🗄️ Cache hasil: {cache_stats['memory_hits']} hit memori, {cache_stats['disk_hits']} hit disk, "
+    f"{cache_stats['misses']} miss · {len(cache)} entri ({cache.memory_bytes / 1024 / 1024:,.1f} MB)"
+)
 
 # --- Visualization Function ---
-def draw_sequential_chain(df, selected_path_list, total_cost):
+# Tata letak berlapis dihitung sekali per dataset; PNG per rute di-cache (dataset hash, path ids)
+@st.cache_data
+def get_chain_layout(_nodes, dataset_key):
+    return chain_render.ChainLayout(_nodes.stages)
+
+@st.cache_data(max_entries=64)
+def draw_sequential_chain(_nodes, dataset_key, path_ids, total_cost):
     """
     Memvisualisasikan Rantai Distribusi Logistik dengan Tata Letak Berlapis yang Jelas.
+    Return PNG bytes (lihat chain_render.render_chain); graf besar otomatis memakai mode downsample.
     """
-    
-    # 1. Setup Graph & Data
-    G = nx.DiGraph()
-    pos = {} # Kamus untuk menyimpan posisi node
-    colors = []
-    labels = {}
-    
-    # Mapping Warna per Stage (Warna lebih cerah agar kontras)
-    stage_colors = {
-        0: '#A9A9A9', # Abu-abu Tua (Start)
-        1: '#FF6B6B', # Merah Cerah (Stage 1)
-        2: '#FFD93D', # Kuning Emas (Stage 2)
-        3: '#6BCB77', # Hijau (Stage 3)
-        4: '#4D96FF'  # Biru (Stage 4 - Finish)
-    }
-
-    # 2. Logika Tata Letak Berlapis (Layered Layout)
-    # Kita perlu tahu ada berapa node di setiap layer (stage) untuk mengatur jarak Y
-    # Adapting column name 'stage' to 'stage_prioritas' and 'nama' to 'nama_lokasi'
-    nodes_per_stage = df.groupby('stage_prioritas')['id'].count().to_dict()
-    current_count_per_stage = {stage: 0 for stage in nodes_per_stage}
-    
-    # Jarak Horizontal antar Stage (Sumbu X)
-    X_SPACING = 3.0
-    # Jarak Vertikal antar Node dalam satu Stage (Sumbu Y)
-    Y_SPACING = 1.5
-
-    for _, row in df.iterrows():
-        node_id = row['id']
-        stage = row['stage_prioritas']
-        
-        G.add_node(node_id)
-        # Label disingkat jika terlalu panjang (Opsional, agar rapi)
-        label_text = row['nama_lokasi']
-        if len(label_text) > 15:
-             label_text = label_text[:12] + "..."
-        labels[node_id] = label_text
-        
-        # --- INI KUNCI TATA LETAKNYA ---
-        # Posisi X: Berdasarkan Stage (Semakin besar stage, semakin ke kanan)
-        x_pos = stage * X_SPACING
-        
-        # Posisi Y: Disejajarkan secara vertikal.
-        # Kita hitung offset agar node berada di tengah secara vertikal.
-        count = current_count_per_stage[stage]
-        total_in_stage = nodes_per_stage[stage]
-        # Rumus ini membuat node tersebar rapi ke atas dan bawah dari garis tengah (Y=0)
-        y_pos = (count - (total_in_stage - 1) / 2.0) * Y_SPACING
-        
-        pos[node_id] = (x_pos, y_pos)
-        current_count_per_stage[stage] += 1
-        
-        colors.append(stage_colors.get(stage, '#000000'))
-
-    # 3. Identifikasi Edge (Garis Jalur)
-    edge_colors = []
-    styles = []
-    edges_to_draw = []
-    
-    for i in range(len(selected_path_list) - 1):
-        u = selected_path_list[i]
-        v = selected_path_list[i+1]
-        
-        G.add_edge(u, v)
-        edges_to_draw.append((u, v))
-        
-        # Logika Gaya Garis (Udara vs Darat)
-        stage_u = df[df['id']==u]['stage_prioritas'].values[0]
-        stage_v = df[df['id']==v]['stage_prioritas'].values[0]
-        
-        # Transisi dari Stage 0 -> 1 dianggap Udara/Jarak Jauh
-        # Also generally inter-stage transitions
-        if stage_u != stage_v:
-            styles.append('dashed')
-            if stage_u == 0 and stage_v == 1:
-                 edge_colors.append('black')
-            else:
-                 edge_colors.append('#E74C3C') # Red
-        else:
-            styles.append('solid')
-            edge_colors.append('#FF4500') # Oranye-Merah agar mencolok
-
-    # 4. Menggambar Canvas (Plotting)
-    fig, ax = plt.subplots(figsize=(14, 8)) # Perbesar ukuran canvas
-    
-    # Gambar Background (Pita Warna per Stage)
-    # Menggunakan koordinat X yang sudah kita tentukan
-    layer_names = ["Start", "Stage 1\n(Prioritas Tinggi)", "Stage 2\n(Sedang)", "Stage 3\n(Ringan)", "Stage 4\n(Finish)"]
-    for stage_idx in range(5):
-        if stage_idx not in nodes_per_stage: continue 
-        
-        start_x = (stage_idx * X_SPACING) - (X_SPACING/2)
-        end_x = (stage_idx * X_SPACING) + (X_SPACING/2)
-        color = stage_colors.get(stage_idx, '#ffffff')
-        # Gambar pita vertikal transparan
-        ax.axvspan(start_x, end_x, color=color, alpha=0.15, zorder=0)
-        # Tambahkan label stage di bagian atas
-        # Calculate max Y for this specific stage to place label
-        max_nodes_any = max(nodes_per_stage.values())
-        header_y_pos = (max_nodes_any * Y_SPACING / 2) + 0.5
-        
-        ax.text(stage_idx * X_SPACING, header_y_pos, 
-                layer_names[stage_idx] if stage_idx < len(layer_names) else f"Stage {stage_idx}", 
-                horizontalalignment='center', fontweight='bold', fontsize=10, color=color)
-
-    # Gambar Nodes
-    nodes = nx.draw_networkx_nodes(G, pos, node_color=colors, node_size=1000, 
-                           edgecolors='black', linewidths=1.5, ax=ax)
-    nodes.set_zorder(2)
-    
-    # Gambar Labels (Nama Kota)
-    # Posisikan label sedikit di bawah node agar tidak tertutup
-    label_pos = {k: (v[0], v[1]-0.3) for k, v in pos.items()}
-    # draw_networkx_labels returns a dict of text objects
-    text_items = nx.draw_networkx_labels(G, label_pos, labels=labels, font_size=9, font_weight='bold', ax=ax)
-    for t in text_items.values():
-        t.set_zorder(3)
-    
-    # Gambar Edges (Jalur Berantai) satu per satu
-    for i, edge in enumerate(edges_to_draw):
-        edges = nx.draw_networkx_edges(
-            G, pos,
-            edgelist=[edge],
-            width=3,
-            edge_color=edge_colors[i],
-            style=styles[i],
-            arrowstyle='-|>', arrowsize=25, # Panah yang jelas
-            connectionstyle="arc3,rad=0.1", # Lengkungan halus
-            ax=ax
-        )
-        for e in edges:
-            e.set_zorder(1)
-
-    # Dekorasi Akhir
-    ax.set_title(f"Visualisasi Rantai Distribusi Optimal (Total Cost: Rp {total_cost:,.0f})", 
-                 fontsize=16, fontweight='bold', pad=20)
-    ax.set_axis_off() # Hilangkan sumbu
-    # Set batas agar semua elemen terlihat (memberi 'padding')
-    ax.set_xlim(-X_SPACING, 4 * X_SPACING + X_SPACING)
-    
-    # Dynamic Y limits
-    max_y = max(nodes_per_stage.values()) * Y_SPACING / 2
-    ax.set_ylim(-max_y - 1, max_y + 2) # Tambah ruang di atas untuk label stage
-
-    return fig
+    return chain_render.render_chain_png(_nodes, get_chain_layout(_nodes, dataset_key), list(path_ids), total_cost)
 
 # --- Display Results ---
 
@@ -201,8 +162,8 @@ else:
             with col1:
                 st.subheader("Visualisasi Jalur")
                 path_ids = [node['id'] for node in sol['full_path']]
-                fig = draw_sequential_chain(df, path_ids, sol['total_cost'])
-                st.pyplot(fig)
+                st.image(draw_sequential_chain(summary.nodes, dataset_hash, tuple(path_ids), sol['total_cost']),
+                         use_column_width=True)
                 
                 st.markdown("""
                 ### ℹ️ Penjelasan Visual
@@ -225,44 +186,148 @@ else:
                 st.success(f"**Total Biaya Estimasi**: IDR {sol['total_cost']:,.2f}")
                 
                 st.write("**Rincian Perjalanan & Biaya:**")
-                
-                # Header Table
-                st.markdown("""
-                | Dari | Ke | Jarak (KM) | Transport | Biaya (IDR) |
-                |---|---|---|---|---|
-                """)
-                
-                full_path = sol['full_path']
-                for j in range(len(full_path)-1):
-                    node_a = full_path[j]
-                    node_b = full_path[j+1]
-                    
-                    # Calculate Dist
-                    dist = solver_instance.calculate_haversine(node_a['lat'], node_a['lon'], node_b['lat'], node_b['lon'])
-                    
-                    # Determine Mode
-                    stage_a = node_a['stage_prioritas']
-                    stage_b = node_b['stage_prioritas']
-                    
-                    mode = 'land'
-                    transport_name = "Truk/Darat"
-                    if stage_a != stage_b:
-                        mode = 'air'
-                        transport_name = "**Helikopter**" # Bold high cost
-                    
-                    # Calculate Cost
-                    # Use solver_instance method if possible, or recalculate manually
-                    # Since solver_instance.get_transport_cost takes nodes, we do:
-                    # But get_transport_cost includes logic. Let's use it.
-                    calced_cost = solver_instance.get_transport_cost(node_a, node_b)
-                    
-                    st.markdown(f"| {node_a['nama_lokasi']} | {node_b['nama_lokasi']} | {dist:.2f} km | {transport_name} | {calced_cost:,.0f} |")
-                
+                # Rincian per leg dari solver (kolom sejajar), dirender sebagai satu dataframe
+                legs_df = pd.DataFrame(sol['legs'])
+                st.dataframe(
+                    legs_df[['from_name', 'to_name', 'distance_km', 'mode', 'variable_cost', 'base_fee', 'cumulative_cost']]
+                    .replace({'mode': {'land': 'Truk/Darat', 'air': 'Helikopter'}}),
+                    column_config={
+                        'from_name': 'Dari', 'to_name': 'Ke',
+                        'distance_km': st.column_config.NumberColumn('Jarak (KM)', format="%.2f"),
+                        'mode': 'Transport',
+                        'variable_cost': st.column_config.NumberColumn('Biaya Variabel (IDR)', format="%.0f"),
+                        'base_fee': st.column_config.NumberColumn('Biaya Basis (IDR)', format="%.0f"),
+                        'cumulative_cost': st.column_config.NumberColumn('Kumulatif (IDR)', format="%.0f"),
+                    },
+                    hide_index=True, use_container_width=True)
+                st.download_button("⬇️ Unduh rincian leg (CSV)", legs_df.to_csv(index=False).encode(),
+                                   file_name=f"rincian_leg_opsi_{i+1}.csv", mime='text/csv', key=f"legs_csv_{i}")
 
-                
                 with st.expander("Debug Info (Transition Steps)"):
                     for info in sol.get('debug_info', []):
                         st.write(f"- {info}")
+                    for stage_id, saved in sol.get('local_search_savings', {}).items():
+                        st.write(f"- Stage {stage_id}: penghematan 2-opt/Or-opt Rp {saved:,.0f}")
+
+                report = summary.profile_report
+                with st.expander("Performance (Profiling Solver)"):
+                    if report is None:
+                        st.write("Profiling tidak aktif untuk solve ini.")
+                    else:
+                        st.write(f"**Total solve:** {report.total_s * 1000:,.2f} ms · "
+                                 f"**Evaluasi biaya transport:** {report.transport_cost_evaluations:,}")
+                        phase_df = report.to_frame()
+                        phase_df['wall_ms'] = phase_df.pop('wall_s') * 1000
+                        st.dataframe(phase_df, hide_index=True, use_container_width=True,
+                                     column_config={"share": st.column_config.ProgressColumn("Porsi", min_value=0, max_value=1)})
+                        st.dataframe(report.counters_frame(), hide_index=True, use_container_width=True)
+
+# --- Perbandingan Depot (satu backward pass untuk semua depot) ---
+# Depot staging di luar dataset (biaya udara ke entry Stage 1 + landing fee)
+DEPOT_PRESETS = [
+    {'id': 'DEPOT-MDN', 'nama_lokasi': 'Medan (Kualanamu)', 'provinsi': 'Sumut', 'lat': 3.6422, 'lon': 98.8853},
+    {'id': 'DEPOT-PDG', 'nama_lokasi': 'Padang (BIM)', 'provinsi': 'Sumbar', 'lat': -0.7868, 'lon': 100.2808},
+]
+
+st.divider()
+st.header("🏭 Perbandingan Depot Awal")
+st.write("Semua depot dievaluasi terhadap tabel DP yang sama (cost-to-finish Stage 1), tanpa menjalankan ulang rekursi.")
+
+if top_k_solutions:
+    depot_options = {summary.nodes.name(nid): nid for nid in summary.stage_node_ids(0)}
+    depot_options.update({d['nama_lokasi']: d for d in DEPOT_PRESETS})
+    chosen = st.multiselect("Kandidat depot", list(depot_options), default=list(depot_options))
+    if chosen:
+        depot_results = get_live_solver().evaluate_depots([depot_options[name] for name in chosen])
+        best_cost = depot_results[0]['total_cost']
+        st.dataframe(pd.DataFrame([{
+            "Peringkat": res['rank'],
+            "Depot": res['depot_name'],
+            "Pintu Masuk Stage 1": summary.nodes.name(res['entry']),
+            "Biaya Awal (IDR)": f"{res['initial_cost']:,.0f}",
+            "Total Biaya (IDR)": f"{res['total_cost']:,.0f}",
+            "Selisih vs Terbaik": f"+{res['total_cost'] - best_cost:,.0f}",
+        } for res in depot_results]), hide_index=True, use_container_width=True)
+
+        # Side by side: maksimal 3 depot teratas
+        for col, res in zip(st.columns(min(3, len(depot_results))), depot_results[:3]):
+            with col:
+                st.metric(f"#{res['rank']} {res['depot_name']}", f"Rp {res['total_cost']:,.0f}",
+                          delta=f"{res['total_cost'] - best_cost:,.0f}" if res['rank'] > 1 else None, delta_color="inverse")
+                st.caption(" → ".join(node['nama_lokasi'] for node in res['full_path']))
+
+# --- Sweep Sensitivitas (Grid Land x Air dalam satu pass) ---
+st.divider()
+st.header("📈 Sweep Sensitivitas Biaya (Land x Air)")
+st.write("Semua kombinasi multiplier di rentang slider dievaluasi sekaligus, tanpa menjalankan ulang rekursi per skenario.")
+
+if top_k_solutions:
+    land_values = np.linspace(1000, 10000, sweep_steps)
+    air_values = np.linspace(10000, 100000, sweep_steps)
+    sweep = get_live_solver().sweep_multipliers(land_values, air_values)
+
+    col_heat, col_routes = st.columns([2, 1])
+    with col_heat:
+        fig_sweep, (ax_cost, ax_route) = plt.subplots(1, 2, figsize=(12, 5))
+        extent = [air_values[0], air_values[-1], land_values[0], land_values[-1]]
+        im = ax_cost.imshow(sweep.costs, origin='lower', aspect='auto', extent=extent, cmap='viridis')
+        ax_cost.set_title("Biaya Optimal (IDR)")
+        ax_cost.set_xlabel("Udara (per Km)")
+        ax_cost.set_ylabel("Darat (per Km)")
+        fig_sweep.colorbar(im, ax=ax_cost)
+        ax_route.imshow(sweep.route_ids, origin='lower', aspect='auto', extent=extent, cmap='tab10')
+        ax_route.set_title("Rute Optimal (ID)")
+        ax_route.set_xlabel("Udara (per Km)")
+        ax_route.plot([cost_air], [cost_land], marker='x', color='white', markersize=12, mew=3)
+        st.pyplot(fig_sweep)
+
+    with col_routes:
+        st.markdown(f"**{len(sweep.routes)} rute berbeda** di grid ini.")
+        route_rows = [{
+            "Route ID": rid,
+            "Jalur": " → ".join(summary.nodes.name(nid) for nid in path),
+        } for rid, path in enumerate(sweep.routes)]
+        st.dataframe(pd.DataFrame(route_rows), hide_index=True, use_container_width=True)
+        if sweep.breakpoints:
+            st.markdown("**Breakpoint (rute optimal berubah):**")
+            st.dataframe(pd.DataFrame(sweep.breakpoints), hide_index=True, use_container_width=True)
+
+    with st.expander("Tabel Lengkap Sweep"):
+        st.dataframe(sweep.to_frame(), hide_index=True, use_container_width=True)
+
+# --- Robustness Monte Carlo (skenario gangguan, paralel) ---
+@st.cache_data(max_entries=8)
+def run_robustness_analysis(_solver, data_key, multipliers, n_scenarios, seed, config):
+    return robustness.run_robustness(_solver, n_scenarios, seed, dict(config))
+
+st.divider()
+st.header("🎲 Analisis Robustness (Monte Carlo)")
+st.write("Ribuan skenario gangguan (lonjakan biaya, fee, node / jalur tertutup) diselesaikan paralel. "
+         "Pilih rute yang murah **dan** stabil, bukan hanya termurah di atas kertas.")
+
+if top_k_solutions:
+    col_n, col_seed, col_close = st.columns(3)
+    n_scenarios = col_n.select_slider("Jumlah skenario", [100, 250, 500, 1000, 2500, 5000], value=500)
+    mc_seed = col_seed.number_input("Seed", 0, 10_000, 0)
+    node_closure = col_close.slider("Peluang node tertutup", 0.0, 0.2, robustness.DEFAULT_CONFIG['node_closure'], 0.01)
+    if st.button("Jalankan analisis robustness"):
+        config = {**robustness.DEFAULT_CONFIG, 'node_closure': node_closure}
+        with st.spinner(f"Menyelesaikan {n_scenarios:,} skenario..."):
+            mc = run_robustness_analysis(get_live_solver(), data_key, tuple(sorted(cost_multipliers.items())),
+                                         n_scenarios, int(mc_seed), tuple(sorted(config.items())))
+        st.caption(f"{len(mc):,} skenario ({int(mc.feasible.sum()):,} feasible) dalam {mc.elapsed_s:.1f}s · "
+                   f"{mc.workers} worker · {len(mc.routes)} rute pemenang berbeda")
+        st.markdown("**Rekomendasi deterministik di bawah gangguan** (regret = selisih terhadap optimum skenario):")
+        st.dataframe(mc.candidates_frame(), hide_index=True, use_container_width=True)
+        st.markdown("**Frekuensi menang per rute:**")
+        st.dataframe(mc.routes_frame(), hide_index=True, use_container_width=True,
+                     column_config={"win_rate": st.column_config.ProgressColumn("Win Rate", min_value=0, max_value=1)})
+        fig_mc, ax_mc = plt.subplots(figsize=(10, 3))
+        ax_mc.hist(mc.optimal_cost[mc.feasible], bins=50, color='#4D96FF')
+        ax_mc.axvline(top_k_solutions[0]['total_cost'], color='black', linestyle='--', label="Biaya deterministik")
+        ax_mc.set_xlabel("Biaya optimal skenario (IDR)")
+        ax_mc.legend()
+        st.pyplot(fig_mc)
 
 # --- Comparison / Naive Section (Placeholder) ---
 # ==========================================
@@ -292,7 +357,7 @@ with tab_ringkas:
         table_data = []
         
         # Helper: Cari detail node berdasarkan ID or Object
-        # In our case, full_path is a list of node dicts already
+        # In our case, full_path is a list of NodeRecord (akses seperti dict)
         
         # Iterasi Mundur dari Finish
         reversed_path = list(reversed(full_path_ids)) 
@@ -300,7 +365,7 @@ with tab_ringkas:
         current_accumulated_cost = 0 
         
         for i, node in enumerate(reversed_path):
-            # node is a dict
+            # node is a NodeRecord
             node_id = node['id']
             stage = node['stage_prioritas'] if 'stage_prioritas' in node else 0
             nama = node['nama_lokasi']
@@ -358,10 +423,7 @@ with tab_ringkas:
 with tab_detail:
     st.markdown("### 🕵️ Analisis Langkah-demi-Langkah (Dynamic Visualization)")
     
-    if 'solver_instance' in locals() and top_k_solutions:
-        # Define logs here so it is available
-        logs = solver_instance.steps_log if hasattr(solver_instance, 'steps_log') else []
-        
+    if top_k_solutions:
         best_sol = top_k_solutions[0]
         path_nodes = best_sol['full_path'] # [Start, Stage1, ..., Stage4]
         
@@ -382,8 +444,8 @@ with tab_detail:
                     st.write("Misi selesai di sini.")
                 else:
                      # Find the relevant log
-                     # Log for node 'name' at 'stage'
-                     relevant_log = next((l for l in logs if l['stage'] == stage and l['node'] == name), None)
+                     # Query ter-index (stage, node); teks dirender hanya untuk node yang ditampilkan
+                     relevant_log = summary.trace_lookup(stage, node['id'])
                      
                      if relevant_log:
                          st.write(f"**Keputusan:** {relevant_log['detail']}")
@@ -410,41 +472,36 @@ with tab_detail:
 with tab_struktur:
     st.info("Ini adalah **Data Mentah Algoritma Dynamic Programming**. Tabel ini menunjukkan semua kemungkinan state (Simpul) yang dihitung oleh komputer.")
     
-    if 'solver_instance' in locals() and hasattr(solver_instance, 'dp_table') and solver_instance.dp_table:
-        dp_table = solver_instance.dp_table
-        
-        # Build Rows
-        dp_rows = []
-        # Sort keys to show Stages in order (Start -> Finish or Finish -> Start?)
-        # Let's show Ascending sequence (0, 1, 2)
-        
-        stages = sorted(dp_table.keys())
-        
-        for i, stage in enumerate(stages):
-            entries = dp_table[stage]
-            for entry_id, val in entries.items():
-                
-                # Get Node Name
-                node_row = df[df['id'] == entry_id]
-                node_name = node_row.iloc[0]['nama_lokasi'] if not node_row.empty else str(entry_id)
-                
-                cost_finish = val.get('total_cost', 0)
-                next_node_id = val.get('next_entry', '-')
-                
-                # Get Next Node Name
-                next_name = "-"
-                if next_node_id:
-                     next_row = df[df['id'] == next_node_id]
-                     next_name = next_row.iloc[0]['nama_lokasi'] if not next_row.empty else str(next_node_id)
-                
-                dp_rows.append({
-                    "State (Tahapan Ke)": i, # Sequence
-                    "Stage ID": stage,
-                    "Titik (Node)": node_name,
-                    "Cost to Finish (Future)": f"Rp {cost_finish:,.0f}",
-                    "Target Selanjutnya": next_name
-                })
-                
-        st.dataframe(pd.DataFrame(dp_rows), use_container_width=True)
+    if len(summary.dp_records()):
+        # Tabel DP bertipe (record array) ditampilkan per halaman; hanya halaman aktif yang dikonversi
+        dp_records = summary.dp_records()
+        col_stage, col_size, col_page = st.columns(3)
+        stage_filter = col_stage.selectbox("Stage", ["Semua"] + sorted(set(dp_records['stage'].tolist())))
+        if stage_filter != "Semua":
+            dp_records = dp_records[dp_records['stage'] == stage_filter]
+        page_size = col_size.selectbox("Baris per halaman", [25, 100, 500], index=1)
+        n_pages = max(1, -(-len(dp_records) // page_size))
+        page = col_page.number_input(f"Halaman (dari {n_pages})", 1, n_pages, 1) - 1
+        st.dataframe(dp_export.page_frame(dp_records, summary.nodes, page, page_size), hide_index=True,
+                     use_container_width=True,
+                     column_config={"cost_to_finish": st.column_config.NumberColumn("Cost to Finish (Future)", format="Rp %.0f")})
+        st.caption(f"{len(dp_records):,} state · ekspor penuh (CSV / NPY / Parquet) lewat `python dp_export.py --dp ...`")
+
+        # Trace keputusan (record numerik) dengan paging yang sama
+        trace = summary.trace
+        if trace.enabled and len(trace):
+            st.markdown("**Trace Keputusan (record numerik)**")
+            trace_pages = max(1, -(-len(trace) // page_size))
+            trace_page = st.number_input(f"Halaman trace (dari {trace_pages})", 1, trace_pages, 1) - 1
+            trace_records = trace.slice(trace_page * page_size, (trace_page + 1) * page_size)
+            st.dataframe(dp_export.page_frame(trace_records, summary.nodes, 0, page_size),
+                         hide_index=True, use_container_width=True)
+
+        # Metode TSP lokal per stage (Held-Karp eksak vs heuristik) + budget runtime/memori
+        if summary.stage_stats:
+            st.markdown("**Metode TSP Lokal per Stage**")
+            stats_df = pd.DataFrame(sorted(summary.stage_stats.values(), key=lambda x: x['stage']))
+            stats_df['memory_kb'] = stats_df.pop('memory_bytes') / 1024
+            st.dataframe(stats_df, hide_index=True, use_container_width=True)
     else:
         st.write("DP Table data not available yet.")
@@ -0,0 +1,191 @@
+import argparse
+import glob
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import solver
+
+# CLI headless: banyak file skenario x grid multiplier, tanpa Streamlit / matplotlib / networkx
+
+def expand_inputs(patterns):
+    # Direktori -> semua *.csv di dalamnya; pola glob -> hasil glob; selain itu path file apa adanya
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(sorted(glob.glob(os.path.join(pattern, '*.csv'))))
+        elif glob.has_magic(pattern):
+            paths.extend(sorted(glob.glob(pattern)))
+        else:
+            paths.append(pattern)
+    return list(dict.fromkeys(paths))
+
+# Cache CSV per proses worker (satu file dipakai oleh banyak kombinasi multiplier)
+_DATA = {}
+
+def _load(path):
+    if path not in _DATA:
+        _DATA[path] = pd.read_csv(path)
+    return _DATA[path]
+
+def solve_task(path, land, air, top_k=1, solver_kwargs=None):
+    """
+    Selesaikan satu (file skenario, multiplier). Return list baris hasil, satu per peringkat:
+    biaya total, id rute, dan rincian per leg (kolom sejajar).
+    """
+    t0 = time.perf_counter()
+    instance = solver.LogisticsSolver(_load(path), cost_multipliers={'land': land, 'air': air}, **(solver_kwargs or {}))
+    results = instance.get_recommendations(top_k=top_k)
+    elapsed = time.perf_counter() - t0
+    rows = []
+    for rank, sol in enumerate(results, start=1):
+        route_ids = [node['id'] for node in sol['full_path']]
+        rows.append({
+            'scenario': path,
+            'land': float(land),
+            'air': float(air),
+            'rank': rank,
+            'total_cost': float(sol['total_cost']),
+            'route_ids': route_ids,
+            'legs': sol['legs'],
+            'solve_s': elapsed,
+        })
+    return rows
+
+def _safe_task(path, land, air, top_k, solver_kwargs):
+    # Error satu skenario tidak menghentikan batch; dicatat sebagai baris 'error'
+    try:
+        return solve_task(path, land, air, top_k, solver_kwargs)
+    except Exception as exc:
+        return [{'scenario': path, 'land': float(land), 'air': float(air), 'error': f"{type(exc).__name__}: {exc}"}]
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class JsonLinesWriter:
+    def __init__(self, path):
+        self._file = sys.stdout if path == '-' else open(path, 'w')
+
+    def write(self, rows):
+        for row in rows:
+            self._file.write(json.dumps(row, default=_json_default) + '\n')
+        self._file.flush()
+
+    def close(self):
+        if self._file is not sys.stdout:
+            self._file.close()
+
+class ParquetWriter:
+    # Opsional (butuh pyarrow); baris di-buffer lalu ditulis per row group.
+    # Baris error tetap ditulis (kolom biaya / rute null + pesan di kolom 'error'), sama seperti JSONL.
+    COLUMNS = ('scenario', 'land', 'air', 'rank', 'total_cost', 'route_ids', 'legs', 'solve_s', 'error')
+
+    def __init__(self, path, batch_rows=256):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Output Parquet membutuhkan pyarrow (pip install pyarrow); gunakan .jsonl")
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self.batch_rows = batch_rows
+        # Tipe kolom skalar jika di batch pertama semuanya null (mis. tidak ada error / semuanya error)
+        self._null_types = {'rank': pa.int64(), 'total_cost': pa.float64(), 'solve_s': pa.float64(), 'error': pa.string()}
+        self._pending = []
+        self._writer = None
+
+    def write(self, rows):
+        self._pending.extend({col: row.get(col) for col in self.COLUMNS} for row in rows)
+        if len(self._pending) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self, final=False):
+        if not self._pending:
+            return
+        pa = self._pa
+        if self._writer is None:
+            # Skema (tipe route_ids / legs) diambil dari baris sukses pertama; batch yang isinya
+            # error semua ditahan dulu kecuali saat close
+            if not final and all(row['error'] is not None for row in self._pending):
+                return
+            table = pa.Table.from_pylist(self._pending)
+            for i, field in enumerate(table.schema):
+                if pa.types.is_null(field.type) and field.name in self._null_types:
+                    table = table.set_column(i, field.name, table.column(i).cast(self._null_types[field.name]))
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        else:
+            table = pa.Table.from_pylist(self._pending, schema=self._writer.schema)
+        self._writer.write_table(table)
+        self._pending = []
+
+    def close(self):
+        self._flush(final=True)
+        if self._writer is not None:
+            self._writer.close()
+
+def open_writer(path, fmt=None):
+    fmt = fmt or ('parquet' if path.endswith('.parquet') else 'jsonl')
+    return ParquetWriter(path) if fmt == 'parquet' else JsonLinesWriter(path)
+
+def run_batch(paths, land_values, air_values, writer, top_k=1, workers=None, solver_kwargs=None):
+    """
+    Fan-out semua (file, land, air) ke process pool; hasil ditulis segera saat task selesai
+    (urutan selesai, bukan urutan input). workers=1 -> jalan di proses ini tanpa pool.
+    """
+    tasks = list(itertools.product(paths, land_values, air_values))
+    summary = {'tasks': len(tasks), 'rows': 0, 'errors': 0}
+    t0 = time.perf_counter()
+
+    def handle(rows):
+        writer.write(rows)
+        summary['rows'] += len(rows)
+        summary['errors'] += sum('error' in row for row in rows)
+        print(f"[{time.perf_counter() - t0:8.2f}s] {rows[0]['scenario']} land={rows[0]['land']:g} air={rows[0]['air']:g}"
+              + (f" ERROR {rows[0]['error']}" if 'error' in rows[0] else f" cost={rows[0]['total_cost']:,.0f}"),
+              file=sys.stderr)
+
+    if workers == 1:
+        for task in tasks:
+            handle(_safe_task(*task, top_k, solver_kwargs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_safe_task, *task, top_k, solver_kwargs) for task in tasks]
+            for fut in as_completed(futures):
+                handle(fut.result())
+    summary['wall_s'] = time.perf_counter() - t0
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch solver OptiRelief: banyak skenario CSV x grid multiplier biaya")
+    parser.add_argument('inputs', nargs='+', help="File CSV, direktori, atau pola glob (mis. 'skenario/*.csv')")
+    parser.add_argument('--land', type=float, nargs='+', default=[5000], help="Multiplier darat (per Km)")
+    parser.add_argument('--air', type=float, nargs='+', default=[50000], help="Multiplier udara (per Km)")
+    parser.add_argument('--top-k', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core, 1 = tanpa pool)")
+    parser.add_argument('--local-search-budget', type=float, default=solver.LOCAL_SEARCH_BUDGET)
+    parser.add_argument('--road-matrix', help="Matriks jarak jalan .npy (road_matrix.py) untuk biaya darat")
+    parser.add_argument('-o', '--output', default='-', help="File .jsonl / .parquet (default: stdout, JSON Lines)")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], help="Paksa format output")
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("Tidak ada file skenario yang cocok")
+    # Trace dimatikan: batch hanya butuh hasil akhir
+    solver_kwargs = {'local_search_budget': args.local_search_budget, 'trace_level': 'off', 'road_matrix': args.road_matrix}
+    writer = open_writer(args.output, args.format)
+    try:
+        summary = run_batch(paths, args.land, args.air, writer, args.top_k, args.workers, solver_kwargs)
+    finally:
+        writer.close()
+    print(f"{summary['tasks']} task, {summary['rows']} baris, {summary['errors']} error dalam {summary['wall_s']:.2f}s",
+          file=sys.stderr)
+    return 1 if summary['errors'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+import solver
+from profiling import SolveProfiler
+from scenario_generator import generate_scenario
+from spatial_index import SpatialIndex
+
+# Benchmark headless (tanpa Streamlit): skala LogisticsSolver.get_recommendations vs ukuran skenario
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - t0
+
+class MemoryProfiler(SolveProfiler):
+    """
+    SolveProfiler yang juga mencatat puncak tracemalloc per fase solver (fase tidak bersarang).
+    Hanya memori proses ini: tur stage yang dikerjakan worker pool tidak ikut terukur.
+    """
+    def reset(self):
+        super().reset()
+        self.peaks = {}
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        tracemalloc.reset_peak()
+        with super().phase(name):
+            yield
+        self.peaks[name] = max(self.peaks.get(name, 0), tracemalloc.get_traced_memory()[1])
+
+def _memory_pass(df, top_k, solver_kwargs):
+    # Pass terpisah dengan tracemalloc aktif: hanya puncak memori yang dipakai, wall time-nya tidak
+    tracemalloc.start()
+    try:
+        instance, traced_s = _timed(lambda: solver.LogisticsSolver(df, **solver_kwargs))
+        construct_peak = tracemalloc.get_traced_memory()[1]
+        profiler = instance.profiler = MemoryProfiler()
+        traced_s += _timed(lambda: instance.get_recommendations(top_k=top_k))[1]
+    finally:
+        tracemalloc.stop()
+    return {'construct': construct_peak, **profiler.peaks}, traced_s
+
+def bench_case(df, top_k=3, solver_kwargs=None):
+    """
+    Dua pass per kasus: wall time diukur tanpa tracemalloc (hook alokasinya melambatkan solve
+    beberapa kali lipat), lalu puncak memori per fase diukur di pass kedua (MemoryProfiler).
+    """
+    solver_kwargs = dict(solver_kwargs or {}, profile=True)
+    instance, construct_s = _timed(lambda: solver.LogisticsSolver(df, **solver_kwargs))
+    results, solve_s = _timed(lambda: instance.get_recommendations(top_k=top_k))
+    peaks, traced_s = _memory_pass(df, top_k, solver_kwargs)
+    # Fase 'stage_tours' vs sisanya (base case, backward, start, k-best, materialisasi path) = DP
+    walls = {p['phase']: p['wall_s'] for p in instance.profile_report.phases}
+    dp_phases = [name for name in walls if name != 'stage_tours']
+    evals = instance.cost_evaluations
+    mb = 1024 * 1024
+    return {
+        'phases': {
+            'construct': {'wall_s': construct_s, 'peak_mb': peaks['construct'] / mb, 'cost_evaluations': evals['matrix']},
+            'stage_tours': {'wall_s': walls.get('stage_tours', 0.0), 'peak_mb': peaks.get('stage_tours', 0) / mb,
+                            'cost_evaluations': evals['stage_tours']},
+            'dp': {'wall_s': sum(walls[name] for name in dp_phases),
+                   'peak_mb': max((peaks.get(name, 0) for name in dp_phases), default=0) / mb,
+                   'cost_evaluations': evals['transition'] + evals['start']},
+        },
+        'total_wall_s': construct_s + solve_s,
+        'traced_wall_s': traced_s, # wall time pass memori (tracemalloc aktif), hanya pembanding overhead
+        'best_cost': float(results[0]['total_cost']) if results else None,
+        'methods': sorted({stat['method'] for stat in instance.stage_stats.values()}),
+    }
+
+def run_benchmarks(sizes, n_stages=4, seed=0, repeat=1, top_k=3, solver_kwargs=None):
+    records = []
+    for size in sizes:
+        df = generate_scenario(n_stages=n_stages, nodes_per_stage=size, seed=seed)
+        runs = [bench_case(df, top_k, solver_kwargs) for _ in range(repeat)]
+        best = min(runs, key=lambda r: r['total_wall_s'])
+        best.update({'nodes_per_stage': size, 'stages': n_stages, 'n_nodes': len(df), 'seed': seed, 'repeat': repeat})
+        records.append(best)
+        print(f"nodes/stage={size:>6}  total={best['total_wall_s']:.3f}s  "
+              + "  ".join(f"{name}={p['wall_s']:.3f}s/{p['peak_mb']:.1f}MB" for name, p in best['phases'].items()))
+    return records
+
+def validate_spatial_index(n=10000, queries=200, k=8, seed=0):
+    # Bandingkan SpatialIndex.knn dengan scan menyeluruh (haversine) pada titik sintetis
+    rng = np.random.default_rng(seed)
+    lat = rng.uniform(-6, 6, n)
+    lon = rng.uniform(95, 110, n)
+    index = SpatialIndex(lat, lon)
+    mismatches = 0
+    for i in rng.integers(0, n, queries):
+        row = solver.haversine_matrix(lat[i:i + 1], lon[i:i + 1], lat, lon)[0]
+        row[i] = np.inf
+        expected = np.argsort(row, kind='stable')[:k]
+        got, _ = index.knn(i, k)
+        mismatches += int(not np.array_equal(got, expected))
+    print(f"spatial index: {queries} query kNN (k={k}) pada {n} titik, mismatch={mismatches}")
+    return mismatches
+
+def compare(current, baseline, threshold=0.2):
+    # Tandai fase yang melambat > threshold dibanding file benchmark sebelumnya
+    base = {r['nodes_per_stage']: r for r in baseline['results']}
+    regressions = []
+    for rec in current['results']:
+        old = base.get(rec['nodes_per_stage'])
+        if old is None:
+            continue
+        for phase, p in rec['phases'].items():
+            old_s = old['phases'].get(phase, {}).get('wall_s')
+            if not old_s:
+                continue
+            ratio = p['wall_s'] / old_s
+            flag = "REGRESI" if ratio > 1 + threshold else ""
+            print(f"nodes/stage={rec['nodes_per_stage']:>6} {phase:<12} {old_s:.3f}s -> {p['wall_s']:.3f}s (x{ratio:.2f}) {flag}")
+            if flag:
+                regressions.append((rec['nodes_per_stage'], phase, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark headless LogisticsSolver pada skenario sintetis")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 50, 200, 500, 1000], help="Node per stage")
+    parser.add_argument('--stages', type=int, default=4)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--top-k', type=int, default=3)
+    parser.add_argument('--local-search-budget', type=float, default=solver.LOCAL_SEARCH_BUDGET)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    parser.add_argument('--compare', help="File JSON benchmark sebelumnya untuk deteksi regresi")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    parser.add_argument('--validate-index', type=int, metavar='N', help="Validasi spatial index pada N titik")
+    args = parser.parse_args(argv)
+
+    if args.validate_index:
+        if validate_spatial_index(args.validate_index):
+            return 1
+
+    solver_kwargs = {'local_search_budget': args.local_search_budget, 'workers': args.workers}
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_revision': _git_revision(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'solver_kwargs': solver_kwargs,
+        },
+        'results': run_benchmarks(args.sizes, args.stages, args.seed, args.repeat, args.top_k, solver_kwargs),
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Hasil ditulis ke {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(report, baseline, args.threshold):
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+import io
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import LineCollection
+
+# Render rantai distribusi (tata letak berlapis per stage) dengan collection ter-batch:
+# satu scatter untuk node, satu LineCollection + satu quiver untuk semua edge rute.
+
+STAGE_COLORS = {
+    0: '#A9A9A9', # Abu-abu Tua (Start)
+    1: '#FF6B6B', # Merah Cerah (Stage 1)
+    2: '#FFD93D', # Kuning Emas (Stage 2)
+    3: '#6BCB77', # Hijau (Stage 3)
+    4: '#4D96FF'  # Biru (Stage 4 - Finish)
+}
+LAYER_NAMES = ["Start", "Stage 1\n(Prioritas Tinggi)", "Stage 2\n(Sedang)", "Stage 3\n(Ringan)", "Stage 4\n(Finish)"]
+X_SPACING = 3.0 # Jarak Horizontal antar Stage (Sumbu X)
+Y_SPACING = 1.5 # Jarak Vertikal antar Node dalam satu Stage (Sumbu Y)
+MAX_HEIGHT = 60.0 # Tinggi maksimum satu kolom stage; stage besar dirapatkan
+NODE_RADIUS = 0.35 # Ujung edge dipotong sejauh ini dari pusat node (panah tidak tertutup node)
+DOWNSAMPLE_NODES = 300 # Di atas ini: node non-rute diringkas (titik kecil tanpa label, disampel)
+
+class ChainLayout:
+    """
+    Posisi (x, y) setiap node (urutan NodeStore), dihitung sekali per dataset. Node disejajarkan
+    vertikal di tengah kolom stage-nya; stage besar dirapatkan agar tinggi kolom <= MAX_HEIGHT.
+    """
+    def __init__(self, stages):
+        stages = np.asarray(stages)
+        self.stage_values, counts = np.unique(stages, return_counts=True)
+        self.counts = dict(zip(self.stage_values.tolist(), counts.tolist()))
+        self.x = stages * X_SPACING
+        self.y = np.empty(len(stages))
+        for stage, n in self.counts.items():
+            members = np.flatnonzero(stages == stage)
+            spacing = min(Y_SPACING, MAX_HEIGHT / max(n - 1, 1))
+            self.y[members] = (np.arange(n) - (n - 1) / 2.0) * spacing
+        self.max_y = max(float(np.abs(self.y).max()) if len(self.y) else 0.0, Y_SPACING)
+
+def _short(label):
+    # Label disingkat jika terlalu panjang (agar rapi)
+    return label if len(label) <= 15 else label[:12] + "..."
+
+def _arc(x1, y1, x2, y2, rad=0.1, samples=16):
+    # Kurva kuadratik seperti connectionstyle "arc3,rad=0.1", ujung dipotong NODE_RADIUS
+    cx, cy = (x1 + x2) / 2 + rad * (y2 - y1), (y1 + y2) / 2 - rad * (x2 - x1)
+    t = np.linspace(0, 1, samples)[:, None]
+    pts = (1 - t) ** 2 * np.array([x1, y1]) + 2 * (1 - t) * t * np.array([cx, cy]) + t ** 2 * np.array([x2, y2])
+    keep = (np.hypot(*(pts - [x1, y1]).T) > NODE_RADIUS) & (np.hypot(*(pts - [x2, y2]).T) > NODE_RADIUS)
+    return pts[keep] if keep.sum() >= 2 else pts[[0, -1]]
+
+def render_chain(nodes, layout, path_ids, total_cost, downsample_nodes=DOWNSAMPLE_NODES, seed=0):
+    """
+    Figure rantai distribusi untuk satu rute. nodes: NodeStore, layout: ChainLayout dataset yang sama.
+    Mode downsample (node > downsample_nodes): hanya node rute yang diberi marker besar + label,
+    node lain digambar sebagai titik kecil (disampel) agar rute tetap jelas terbaca.
+    """
+    path_pos = np.array([nodes.pos(nid) for nid in path_ids], dtype=np.int64)
+    downsample = len(nodes) > downsample_nodes
+    on_route = np.zeros(len(nodes), dtype=bool)
+    on_route[path_pos] = True
+    colors = np.array([STAGE_COLORS.get(int(s), '#000000') for s in nodes.stages])
+
+    fig, ax = plt.subplots(figsize=(14, 8)) # Perbesar ukuran canvas
+
+    # Pita warna per stage + label stage di bagian atas
+    header_y = layout.max_y + 0.5
+    for stage in layout.stage_values.tolist():
+        color = STAGE_COLORS.get(stage, '#ffffff')
+        ax.axvspan(stage * X_SPACING - X_SPACING / 2, stage * X_SPACING + X_SPACING / 2, color=color, alpha=0.15, zorder=0)
+        ax.text(stage * X_SPACING, header_y, LAYER_NAMES[stage] if stage < len(LAYER_NAMES) else f"Stage {stage}",
+                horizontalalignment='center', fontweight='bold', fontsize=10, color=color)
+
+    # Node: satu scatter untuk node latar, satu untuk node rute
+    if downsample:
+        background = np.flatnonzero(~on_route)
+        if len(background) > downsample_nodes:
+            background = np.sort(np.random.default_rng(seed).choice(background, downsample_nodes, replace=False))
+        ax.scatter(layout.x[background], layout.y[background], s=12, c=colors[background], alpha=0.6, linewidths=0, zorder=2)
+        labelled = np.flatnonzero(on_route)
+    else:
+        others = np.flatnonzero(~on_route)
+        ax.scatter(layout.x[others], layout.y[others], s=1000, c=colors[others], edgecolors='black', linewidths=1.5, zorder=2)
+        labelled = np.arange(len(nodes))
+    ax.scatter(layout.x[path_pos], layout.y[path_pos], s=1000 if not downsample else 250, c=colors[path_pos],
+               edgecolors='black', linewidths=1.5, zorder=2)
+    for i in labelled.tolist():
+        ax.text(layout.x[i], layout.y[i] - 0.3, _short(nodes.names[i]), fontsize=9 if not downsample else 7,
+                fontweight='bold', horizontalalignment='center', verticalalignment='center', zorder=3)
+
+    # Edge rute: Darat (solid oranye) / Udara (putus-putus; hitam untuk Start -> Stage 1)
+    src, dst = path_pos[:-1], path_pos[1:]
+    stage_u, stage_v = nodes.stages[src], nodes.stages[dst]
+    air = stage_u != stage_v
+    edge_colors = np.where(air, np.where((stage_u == 0) & (stage_v == 1), 'black', '#E74C3C'), '#FF4500')
+    segments = [_arc(layout.x[u], layout.y[u], layout.x[v], layout.y[v]) for u, v in zip(src.tolist(), dst.tolist())]
+    if segments:
+        ax.add_collection(LineCollection(segments, colors=edge_colors, linewidths=3, zorder=1,
+                                         linestyles=['dashed' if a else 'solid' for a in air]))
+        tips = np.array([seg[-1] for seg in segments])
+        tails = np.array([seg[-2] for seg in segments])
+        ax.quiver(tails[:, 0], tails[:, 1], tips[:, 0] - tails[:, 0], tips[:, 1] - tails[:, 1], color=edge_colors,
+                  angles='xy', scale_units='xy', scale=1, width=0.004, headwidth=4, headlength=5, zorder=1)
+
+    # Dekorasi Akhir
+    ax.set_title(f"Visualisasi Rantai Distribusi Optimal (Total Cost: Rp {total_cost:,.0f})", fontsize=16, fontweight='bold', pad=20)
+    ax.set_axis_off() # Hilangkan sumbu
+    ax.set_xlim(-X_SPACING, max(layout.stage_values.max(), 4) * X_SPACING + X_SPACING)
+    ax.set_ylim(-layout.max_y - 1, layout.max_y + 2) # Tambah ruang di atas untuk label stage
+    return fig
+
+def render_chain_png(nodes, layout, path_ids, total_cost, dpi=100, **kwargs):
+    fig = render_chain(nodes, layout, path_ids, total_cost, **kwargs)
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png', dpi=dpi, bbox_inches='tight')
+    plt.close(fig)
+    return buf.getvalue()
@@ -0,0 +1,159 @@
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+import solver
+from trace_log import TRACE_DTYPE
+
+# Ekspor kolom bertipe (tabel DP + trace keputusan): record array NumPy -> CSV / NPY / Parquet per potongan,
+# tanpa merender teks atau memuat seluruh tabel sekaligus.
+
+# Kolom posisi yang dipetakan ke id / nama node saat diekspor
+POSITION_FIELDS = ('entry', 'exit', 'next', 'node')
+CHUNK_ROWS = 65_536
+
+def iter_chunks(records, chunk_rows=CHUNK_ROWS):
+    for lo in range(0, len(records), chunk_rows):
+        yield records[lo:lo + chunk_rows]
+
+def _id_column(nodes, pos):
+    # Posisi -> id node; -1 -> NA (id numerik tetap bertipe integer lewat Int64)
+    valid = pos >= 0
+    ids = nodes.ids[np.where(valid, pos, 0)]
+    if valid.all():
+        return ids
+    if np.issubdtype(ids.dtype, np.integer):
+        column = pd.array(ids, dtype='Int64')
+    else:
+        column = ids.astype(str).astype(object)
+    column[~valid] = None
+    return column
+
+def to_columns(records, nodes, names=False):
+    """
+    Record array -> dict kolom. Kolom posisi diganti <kolom>_id (dan <kolom>_name jika names=True);
+    kolom lain (stage, biaya) tetap bertipe numerik.
+    """
+    columns = {}
+    for field in records.dtype.names:
+        values = records[field]
+        if field not in POSITION_FIELDS:
+            columns[field] = values
+            continue
+        columns[f"{field}_id"] = _id_column(nodes, values)
+        if names:
+            columns[f"{field}_name"] = np.where(values >= 0, nodes.names[np.where(values >= 0, values, 0)], None)
+    return columns
+
+def page_frame(records, nodes, page, page_size):
+    # Satu halaman (nomor mulai 0) sebagai DataFrame; hanya baris halaman ini yang dikonversi
+    lo = page * page_size
+    return pd.DataFrame(to_columns(records[lo:lo + page_size], nodes, names=True))
+
+class _CsvSink:
+    def __init__(self, path):
+        self.path = path
+        self._header = True
+
+    def write(self, frame):
+        frame.to_csv(self.path, mode='w' if self._header else 'a', header=self._header, index=False)
+        self._header = False
+
+    def close(self):
+        if self._header: # tidak ada baris sama sekali: tetap tulis file kosong
+            open(self.path, 'w').close()
+
+class _ParquetSink:
+    # Opsional (butuh pyarrow); satu row group per potongan
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Ekspor Parquet membutuhkan pyarrow (pip install pyarrow); gunakan .csv atau .npy")
+        self._pa, self._pq = pa, pq
+        self.path = path
+        self._writer = None
+
+    def write(self, frame):
+        table = self._pa.Table.from_pandas(frame, preserve_index=False)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+def write_records(chunks, path, nodes, total=None, dtype=None):
+    """
+    Tulis potongan record array ke `path` secara streaming. Format dari ekstensi:
+      .npy     -> record array apa adanya (posisi NodeStore), butuh `total` + `dtype`
+      .csv     -> kolom id (+ nama) node, header sekali
+      .parquet -> idem, satu row group per potongan (butuh pyarrow)
+    Return jumlah baris yang ditulis.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    rows = 0
+    if ext == '.npy':
+        if total is None or dtype is None:
+            raise ValueError("Ekspor .npy membutuhkan total baris dan dtype")
+        out = np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(total,))
+        for chunk in chunks:
+            out[rows:rows + len(chunk)] = chunk
+            rows += len(chunk)
+        out.flush()
+        return rows
+    if ext == '.csv':
+        sink = _CsvSink(path)
+    elif ext == '.parquet':
+        sink = _ParquetSink(path)
+    else:
+        raise ValueError(f"Format ekspor tidak dikenal: {ext} (pilihan: .csv, .npy, .parquet)")
+    try:
+        for chunk in chunks:
+            sink.write(pd.DataFrame(to_columns(chunk, nodes, names=True)))
+            rows += len(chunk)
+    finally:
+        sink.close()
+    return rows
+
+def export_dp(instance, path, chunk_rows=CHUNK_ROWS):
+    records = instance.dp_records()
+    return write_records(iter_chunks(records, chunk_rows), path, instance.nodes, len(records), solver.DP_DTYPE)
+
+def export_trace(instance, path, kinds=None, chunk_rows=CHUNK_ROWS):
+    # Trace dibaca per potongan (file spill di-memmap), jadi run besar tidak dimuat penuh ke memori
+    trace = instance.trace
+    chunks = trace.iter_records(chunk_rows, kinds)
+    total = trace.count(kinds) if path.lower().endswith('.npy') else None
+    return write_records(chunks, path, instance.nodes, total, TRACE_DTYPE)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve lalu ekspor tabel DP dan trace keputusan (kolom bertipe)")
+    parser.add_argument('data', nargs='?', default='data_lokasi_bencana.csv')
+    parser.add_argument('--land', type=float, default=5000)
+    parser.add_argument('--air', type=float, default=50000)
+    parser.add_argument('--dp', help="File tabel DP (.csv / .npy / .parquet)")
+    parser.add_argument('--trace', help="File trace (.csv / .npy / .parquet)")
+    parser.add_argument('--trace-level', default='decisions', choices=['decisions', 'full'])
+    parser.add_argument('--trace-spill', help="File spill trace untuk run besar (lihat TraceLog)")
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    if not args.dp and not args.trace:
+        parser.error("Isi --dp dan/atau --trace")
+
+    instance = solver.LogisticsSolver(pd.read_csv(args.data), cost_multipliers={'land': args.land, 'air': args.air},
+                                      trace_level=args.trace_level, trace_spill_path=args.trace_spill)
+    instance.get_recommendations()
+    if args.dp:
+        print(f"Tabel DP: {export_dp(instance, args.dp, args.chunk_rows):,} baris -> {args.dp}", file=sys.stderr)
+    if args.trace:
+        print(f"Trace: {export_trace(instance, args.trace, chunk_rows=args.chunk_rows):,} baris -> {args.trace}", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import sys
+import time
+
+import numpy as np
+
+# Klien load test lokal untuk service.py (asyncio, koneksi keep-alive, tanpa dependensi eksternal)
+
+async def request(reader, writer, host, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b''
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def fetch(host, port, path):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        return await request(reader, writer, host, 'GET', path)
+    finally:
+        writer.close()
+
+def make_params(dataset, distinct, top_k, seed=0):
+    # Campuran multiplier: `distinct` kombinasi berbeda -> makin kecil, makin banyak coalescing / cache hit
+    rng = random.Random(seed)
+    grid = list(itertools.product(np.linspace(1000, 10000, 10).tolist(), np.linspace(10000, 100000, 10).tolist()))
+    rng.shuffle(grid)
+    combos = grid[:max(1, distinct)]
+    while True:
+        land, air = rng.choice(combos)
+        yield {'dataset': dataset, 'land': land, 'air': air, 'top_k': top_k}
+
+async def worker(host, port, params, remaining, latencies, statuses, sources):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            payload = next(params)
+            t0 = time.perf_counter()
+            status, body = await request(reader, writer, host, 'POST', '/solve', payload)
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] = statuses.get(status, 0) + 1
+            source = body.get('source', 'error')
+            sources[source] = sources.get(source, 0) + 1
+    finally:
+        writer.close()
+
+async def run_load(host, port, total, concurrency, dataset='default', distinct=20, top_k=1, seed=0):
+    params = make_params(dataset, distinct, top_k, seed)
+    remaining = [total]
+    latencies, statuses, sources = [], {}, {}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker(host, port, params, remaining, latencies, statuses, sources)
+                           for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    ms = np.array(latencies) * 1000
+    p50, p90, p99 = np.percentile(ms, [50, 90, 99]) if len(ms) else (0, 0, 0)
+    summary = {'requests': len(ms), 'wall_s': wall, 'throughput_rps': len(ms) / wall if wall > 0 else 0.0,
+               'p50_ms': float(p50), 'p90_ms': float(p90), 'p99_ms': float(p99),
+               'statuses': statuses, 'sources': sources}
+    _, summary['server_stats'] = await fetch(host, port, '/stats')
+    return summary
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test lokal untuk service.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('-n', '--requests', type=int, default=200)
+    parser.add_argument('-c', '--concurrency', type=int, default=16)
+    parser.add_argument('--dataset', default='default')
+    parser.add_argument('--distinct', type=int, default=20, help="Jumlah kombinasi multiplier berbeda")
+    parser.add_argument('--top-k', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_load(args.host, args.port, args.requests, args.concurrency,
+                                   args.dataset, args.distinct, args.top_k, args.seed))
+    print(json.dumps(summary, indent=2))
+    return 0 if set(summary['statuses']) == {200} else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import time
+import numpy as np
+
+# Perbaikan minimal agar sebuah move dianggap menguntungkan (hindari loop karena noise float)
+IMPROVEMENT_EPS = 1e-7
+# Konversi budget local search (detik) ke jumlah evaluasi move: batas deterministik,
+# hasil sama di setiap run dan identik antara jalur serial dan paralel
+MOVES_PER_SECOND = 1_000_000
+
+def move_cap(budget_s, n_paths):
+    # Jatah evaluasi move per path bila budget_s dibagi rata ke n_paths path
+    return int(budget_s * MOVES_PER_SECOND / max(n_paths, 1))
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+def neighbour_lists(cost, k=8):
+    # k kandidat termurah per node (tanpa dirinya sendiri), diurutkan dari yang terdekat
+    m = len(cost)
+    k = min(k, m - 1)
+    if k <= 0:
+        return np.empty((m, 0), dtype=np.int64)
+    masked = cost + np.diag(np.full(m, np.inf))
+    nbrs = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(masked, nbrs, axis=1).argsort(axis=1, kind='stable')
+    return np.take_along_axis(nbrs, order, axis=1)
+
+def path_cost(path, cost):
+    p = np.asarray(path)
+    return float(cost[p[:-1], p[1:]].sum()) if len(p) > 1 else 0.0
+
+def _prefix(path, cost):
+    # fwd[k] / bwd[k]: biaya sub-path p[0..k] searah / berlawanan arah (untuk delta reversal asimetris)
+    p = np.asarray(path)
+    fwd = np.concatenate(([0.0], np.cumsum(cost[p[:-1], p[1:]])))
+    bwd = np.concatenate(([0.0], np.cumsum(cost[p[1:], p[:-1]])))
+    return fwd, bwd
+
+def _two_opt_pass(path, cost, nbrs, moves_left, deadline):
+    # Return: (path baru / path sama jika optimum lokal / None jika jatah habis, move terpakai)
+    m = len(path)
+    pos = np.empty(m, dtype=np.int64)
+    pos[path] = np.arange(m)
+    fwd, bwd = _prefix(path, cost)
+    used = 0
+    for i in range(1, m - 1):
+        if used >= moves_left or _expired(deadline):
+            return None, used
+        a, b = path[i - 1], path[i]
+        used += len(nbrs[a])
+        for e in nbrs[a]:
+            j = pos[e]
+            if j <= i:
+                continue
+            old = cost[a, b] + (fwd[j] - fwd[i])
+            new = cost[a, e] + (bwd[j] - bwd[i])
+            if j < m - 1:
+                f = path[j + 1]
+                old += cost[e, f]
+                new += cost[b, f]
+            if new - old < -IMPROVEMENT_EPS:
+                return path[:i] + path[i:j + 1][::-1] + path[j + 1:], used
+    return path, used
+
+def _or_opt_pass(path, cost, nbrs, moves_left, deadline, max_segment=3):
+    m = len(path)
+    pos = np.empty(m, dtype=np.int64)
+    pos[path] = np.arange(m)
+    fwd, bwd = _prefix(path, cost)
+    used = 0
+    for seg_len in range(1, max_segment + 1):
+        for i in range(1, m - seg_len + 1):
+            if used >= moves_left or _expired(deadline):
+                return None, used
+            last = i + seg_len - 1
+            s0, s1 = path[i], path[last]
+            used += len(nbrs[s0]) + len(nbrs[s1])
+            prev = path[i - 1]
+            nxt = path[last + 1] if last + 1 < m else None
+            remove_gain = cost[prev, s0] + (cost[s1, nxt] - cost[prev, nxt] if nxt is not None else 0.0)
+            internal_fwd = fwd[last] - fwd[i]
+            internal_bwd = bwd[last] - bwd[i]
+            # Sisip segmen setelah g: searah (g->s0) atau terbalik (g->s1)
+            for reverse, anchor in ((False, s0), (True, s1)):
+                head, tail = (s1, s0) if reverse else (s0, s1)
+                internal_delta = (internal_bwd - internal_fwd) if reverse else 0.0
+                for g in nbrs[anchor]:
+                    k = pos[g]
+                    if i - 1 <= k <= last:
+                        continue
+                    h = path[k + 1] if k + 1 < m else None
+                    add = cost[g, head] + (cost[tail, h] - cost[g, h] if h is not None else 0.0)
+                    if add + internal_delta - remove_gain < -IMPROVEMENT_EPS:
+                        segment = path[i:last + 1]
+                        if reverse:
+                            segment = segment[::-1]
+                        rest = path[:i] + path[last + 1:]
+                        at = rest.index(g) + 1
+                        return rest[:at] + segment + rest[at:], used
+    return path, used
+
+def improve_open_path(path, cost, nbrs, max_moves, deadline=None):
+    """
+    Local search 2-opt + Or-opt untuk open path dengan titik awal tetap (entry).
+    Ujung akhir (exit) boleh berubah. Berhenti jika tidak ada move yang memperbaiki
+    atau max_moves evaluasi move habis (deterministik). deadline (perf_counter, opsional)
+    hanya batas luar waktu. Return: (path_baru, penghematan, move terpakai).
+    """
+    path = list(path)
+    if len(path) < 3:
+        return path, 0.0, 0
+    before = path_cost(path, cost)
+    if not np.isfinite(before):
+        return path, 0.0, 0 # path melewati edge tertutup (inf): tidak ada delta yang bermakna
+    moves = 0
+    # Arah balik bisa melewati edge tertutup: inf - inf -> nan, dan move dengan delta nan selalu ditolak
+    with np.errstate(invalid='ignore'):
+        while moves < max_moves and not _expired(deadline):
+            moved, used = _two_opt_pass(path, cost, nbrs, max_moves - moves, deadline)
+            moves += used
+            if moved is None:
+                break
+            if moved is not path:
+                path = moved
+                continue
+            moved, used = _or_opt_pass(path, cost, nbrs, max_moves - moves, deadline)
+            moves += used
+            if moved is None:
+                break
+            if moved is path:
+                break # local optimum
+            path = moved
+    return path, before - path_cost(path, cost), moves
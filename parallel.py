@@ -0,0 +1,111 @@
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from solver import StageTours, exact_stage_tours, heuristic_stage_tours
+
+class SharedArrays:
+    """
+    Publikasikan array NumPy ke shared memory agar worker cukup attach (tanpa pickling
+    DataFrame / matriks biaya). spec bisa dikirim ke worker: {nama: (shm_name, shape, dtype)}.
+    """
+    def __init__(self, arrays):
+        self._handles = []
+        self.spec = {}
+        for name, arr in arrays.items():
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            self._handles.append(shm)
+            self.spec[name] = (shm.name, arr.shape, arr.dtype.str)
+
+    def close(self):
+        for shm in self._handles:
+            shm.close()
+            shm.unlink()
+        self._handles = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Cache attach per proses worker (satu worker bisa mengerjakan banyak task)
+_ATTACHED = {}
+
+def attach_shared(spec):
+    arrays = {}
+    for name, (shm_name, shape, dtype) in spec.items():
+        if shm_name not in _ATTACHED:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            _ATTACHED[shm_name] = (shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf))
+        arrays[name] = _ATTACHED[shm_name][1]
+    return arrays
+
+def _stage_task(spec, stage_id, positions, config, entries, coords=None):
+    # time.time(): titik acuan sama di semua proses (perf_counter hanya valid per proses);
+    # waktu komputasi = CPU time task, agar antre CPU tidak terhitung sebagai kerja
+    started = time.time()
+    t0 = time.process_time()
+    cost = attach_shared(spec)['cost_matrix']
+    sub_cost = cost[np.ix_(positions, positions)]
+    if entries is None:
+        tours = exact_stage_tours(stage_id, positions, sub_cost)
+    else:
+        tours = heuristic_stage_tours(stage_id, positions, sub_cost, config['local_search_budget'],
+                                      config['local_search_neighbours'], entries, coords)
+    return tours, time.process_time() - t0, started, time.time()
+
+def solve_stage_tours_parallel(solver, stages):
+    """
+    Fan-out tur lokal per stage (Held-Karp: 1 task per stage) dan per potongan entry
+    (heuristik) ke process pool. Hasil digabung per stage dengan urutan tetap sehingga
+    identik dengan jalur serial. Statistik per stage (semua stage berbagi satu pool):
+      parallel_compute_s: total CPU time task stage ini (~ biaya jalur serial)
+      parallel_span_s: task pertama stage ini mulai -> task terakhirnya selesai
+      parallelism: compute / span = rata-rata jumlah task stage ini yang berjalan bersamaan
+      efficiency: parallelism / min(workers, jumlah task) (1.0 = semua slot yang bisa dipakai sibuk)
+    """
+    config = {
+        'local_search_budget': solver.local_search_budget,
+        'local_search_neighbours': solver.local_search_neighbours,
+    }
+    results = defaultdict(dict)
+    compute_s = defaultdict(float)
+    span = {}
+    with SharedArrays({'cost_matrix': solver.cost_matrix}) as shared, \
+            ProcessPoolExecutor(max_workers=solver.workers) as pool:
+        futures = {}
+        for stage in stages:
+            positions = solver.stage_positions[stage]
+            m = len(positions)
+            if solver.use_exact(m):
+                chunks = [None]
+            else:
+                chunks = np.array_split(np.arange(m), min(solver.workers, m))
+            for chunk_idx, entries in enumerate(chunks):
+                fut = pool.submit(_stage_task, shared.spec, stage, positions, config, entries, solver.stage_coords(stage))
+                futures[fut] = (stage, chunk_idx)
+        for fut in as_completed(futures):
+            stage, chunk_idx = futures[fut]
+            tours, seconds, started, finished = fut.result()
+            results[stage][chunk_idx] = tours
+            compute_s[stage] += seconds
+            first, last = span.get(stage, (started, finished))
+            span[stage] = (min(first, started), max(last, finished))
+
+    stage_tours = {}
+    for stage in stages:
+        parts = [results[stage][k] for k in sorted(results[stage])]
+        tours = parts[0] if len(parts) == 1 else StageTours.merge(parts)
+        stage_tours[stage] = tours
+        span_s = span[stage][1] - span[stage][0]
+        parallelism = compute_s[stage] / span_s if span_s > 0 else 1.0
+        solver.record_stage_stats(tours, workers=solver.workers, parallel_tasks=len(parts),
+                                  parallel_compute_s=compute_s[stage], parallel_span_s=span_s, parallelism=parallelism,
+                                  efficiency=parallelism / min(solver.workers, len(parts)))
+    return stage_tours
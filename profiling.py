@@ -0,0 +1,109 @@
+import time
+
+import pandas as pd
+
+class ProfileReport:
+    """
+    Ringkasan satu solve: timer per fase (urut sesuai eksekusi), counter hot-path,
+    dan evaluasi biaya per fase dari LogisticsSolver.cost_evaluations.
+    """
+    def __init__(self, phases, counters, cost_evaluations, total_s):
+        self.phases = phases # [{'phase', 'wall_s', 'calls'}]
+        self.counters = counters
+        self.cost_evaluations = cost_evaluations
+        self.total_s = total_s
+
+    @property
+    def transport_cost_evaluations(self):
+        return sum(self.cost_evaluations.values())
+
+    def to_frame(self):
+        df = pd.DataFrame(self.phases, columns=['phase', 'wall_s', 'calls'])
+        df['share'] = df['wall_s'] / self.total_s if self.total_s > 0 else 0.0
+        return df
+
+    def counters_frame(self):
+        rows = [{'counter': name, 'value': value} for name, value in self.counters.items()]
+        rows += [{'counter': f"cost_evaluations.{phase}", 'value': value} for phase, value in self.cost_evaluations.items()]
+        return pd.DataFrame(rows, columns=['counter', 'value'])
+
+    def to_dict(self):
+        return {'total_s': self.total_s, 'phases': self.phases, 'counters': dict(self.counters),
+                'cost_evaluations': dict(self.cost_evaluations)}
+
+    def __repr__(self):
+        slowest = max(self.phases, key=lambda p: p['wall_s'])['phase'] if self.phases else '-'
+        return f"ProfileReport(total_s={self.total_s:.4f}, phases={len(self.phases)}, slowest={slowest!r})"
+
+class _PhaseTimer:
+    __slots__ = ('profiler', 'name', 't0')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._add_phase(self.name, time.perf_counter() - self.t0)
+
+class SolveProfiler:
+    """
+    Instrumentasi aktif: phase(name) sebagai context manager, count(name, n) untuk counter.
+    Counter dinaikkan per loop / per stage (bukan per elemen) agar overhead tetap kecil.
+    """
+    enabled = True
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._phases = {} # nama -> [wall_s, calls], urutan insert = urutan eksekusi
+        self.counters = {}
+        self._t0 = time.perf_counter()
+
+    def phase(self, name):
+        return _PhaseTimer(self, name)
+
+    def _add_phase(self, name, seconds):
+        entry = self._phases.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def report(self, cost_evaluations):
+        phases = [{'phase': name, 'wall_s': wall, 'calls': calls} for name, (wall, calls) in self._phases.items()]
+        return ProfileReport(phases, dict(self.counters), dict(cost_evaluations), time.perf_counter() - self._t0)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+_NULL_TIMER = _NullTimer()
+
+class NullProfiler:
+    # Default saat profiling nonaktif: semua hook no-op, tanpa alokasi / perf_counter
+    enabled = False
+
+    def reset(self):
+        pass
+
+    def phase(self, name):
+        return _NULL_TIMER
+
+    def count(self, name, n=1):
+        pass
+
+    def report(self, cost_evaluations):
+        return None
+
+NULL_PROFILER = NullProfiler()
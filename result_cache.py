@@ -0,0 +1,129 @@
+import hashlib
+import json
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+def dataset_hash(df):
+    # Hash isi data lokasi (kolom + nilai), stabil antar sesi/proses
+    h = hashlib.sha256()
+    h.update(json.dumps([str(c) for c in df.columns]).encode())
+    h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return h.hexdigest()
+
+def make_key(data_hash, cost_multipliers, top_k):
+    params = json.dumps({'multipliers': {k: float(v) for k, v in sorted(cost_multipliers.items())},
+                         'top_k': int(top_k)}, sort_keys=True)
+    return f"{data_hash}:{hashlib.sha256(params.encode()).hexdigest()[:16]}"
+
+class ResultCache:
+    """
+    Cache hasil solver lintas sesi: LRU di memori dengan batas byte (ukuran = panjang pickle),
+    plus tier SQLite opsional agar hasil bertahan saat aplikasi di-restart. Tier SQLite dibatasi
+    max_disk_bytes (evict LRU berdasarkan last_access) dan/atau max_age_s (entri yang tidak
+    diakses selama itu dihapus). Simpan hasil yang ringkas (mis. solver.SolveSummary), bukan solver.
+    """
+    def __init__(self, max_bytes=256 * 1024 * 1024, sqlite_path=None, max_disk_bytes=1024 * 1024 * 1024, max_age_s=None):
+        self.max_bytes = max_bytes
+        self.sqlite_path = sqlite_path
+        self.max_disk_bytes = max_disk_bytes
+        self.max_age_s = max_age_s
+        self._items = OrderedDict() # key -> (value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'disk_evictions': 0}
+        if sqlite_path:
+            with self._connect() as conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB, size INTEGER, last_access REAL)")
+                conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+                self._evict_disk(conn)
+
+    def _connect(self):
+        return sqlite3.connect(self.sqlite_path, timeout=30)
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def memory_bytes(self):
+        return self._bytes
+
+    def get(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return self._items[key][0]
+        if self.sqlite_path:
+            with self._connect() as conn:
+                row = conn.execute("SELECT value FROM results WHERE key = ? AND last_access >= ?",
+                                   (key, self._expired_before())).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (time.time(), key))
+            if row is not None:
+                value = pickle.loads(row[0])
+                with self._lock:
+                    self.stats['disk_hits'] += 1
+                    self._store(key, value, len(row[0]))
+                return value
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key, value):
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, value, len(blob))
+        if self.sqlite_path and (self.max_disk_bytes is None or len(blob) <= self.max_disk_bytes):
+            with self._connect() as conn:
+                conn.execute("INSERT OR REPLACE INTO results (key, value, size, last_access) VALUES (?, ?, ?, ?)",
+                             (key, blob, len(blob), time.time()))
+                self._evict_disk(conn)
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def _expired_before(self):
+        return time.time() - self.max_age_s if self.max_age_s is not None else float('-inf')
+
+    def _evict_disk(self, conn):
+        # Hapus entri kedaluwarsa, lalu entri dengan last_access tertua sampai total <= max_disk_bytes
+        evicted = conn.execute("DELETE FROM results WHERE last_access < ?", (self._expired_before(),)).rowcount
+        if self.max_disk_bytes is not None:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_disk_bytes:
+                for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+                    if total <= self.max_disk_bytes:
+                        break
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    total -= size
+                    evicted += 1
+        if evicted:
+            with self._lock:
+                self.stats['disk_evictions'] += evicted
+
+    def _store(self, key, value, size):
+        if key in self._items:
+            self._bytes -= self._items.pop(key)[1]
+        if size > self.max_bytes:
+            return # Terlalu besar untuk tier memori (tetap tersimpan di SQLite jika aktif)
+        self._items[key] = (value, size)
+        self._bytes += size
+        # Evict LRU sampai di bawah batas memori
+        while self._bytes > self.max_bytes:
+            _, (_, old_size) = self._items.popitem(last=False)
+            self._bytes -= old_size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
@@ -0,0 +1,93 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# Matriks jarak/waktu jalan (origin-destination) dari routing engine offline.
+# Layout biner: <nama>.npy = float32 [N, N] (dibuka memory-mapped), <nama>.ids.npy = id node per baris/kolom.
+# Pasangan yang tidak tersedia disimpan sebagai NaN -> solver memakai haversine sebagai fallback.
+
+def ids_path(path):
+    return os.path.splitext(path)[0] + '.ids.npy'
+
+def save_road_matrix(path, ids, matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.shape != (len(ids), len(ids)):
+        raise ValueError(f"Ukuran matriks {matrix.shape} tidak cocok dengan {len(ids)} id")
+    np.save(path, matrix)
+    np.save(ids_path(path), np.asarray(ids))
+
+def from_od_csv(csv_path, out_path, value_col='distance_km', chunksize=1_000_000):
+    """
+    Konversi ekspor OD panjang (origin_id, dest_id, <value_col>) ke layout biner. Matriks ditulis
+    langsung ke file memory-mapped per chunk, jadi OD 50k x 50k tidak perlu muat di RAM.
+    """
+    ids = pd.unique(np.concatenate([pd.unique(chunk.to_numpy().ravel())
+                                    for chunk in pd.read_csv(csv_path, usecols=['origin_id', 'dest_id'], chunksize=chunksize)]))
+    index = pd.Index(ids)
+    out = np.lib.format.open_memmap(out_path, mode='w+', dtype=np.float32, shape=(len(ids), len(ids)))
+    out[:] = np.nan
+    for chunk in pd.read_csv(csv_path, usecols=['origin_id', 'dest_id', value_col], chunksize=chunksize):
+        out[index.get_indexer(chunk['origin_id']), index.get_indexer(chunk['dest_id'])] = chunk[value_col].to_numpy(np.float32)
+    out.flush()
+    np.save(ids_path(out_path), np.asarray(ids))
+    return len(ids)
+
+class RoadMatrix:
+    """
+    Akses read-only ke matriks OD float32 ter-index id (memory-mapped: hanya halaman yang
+    disentuh yang dibaca dari disk). Boleh asimetris (A->B != B->A).
+    """
+    def __init__(self, path):
+        self.path = path
+        self.matrix = np.load(path, mmap_mode='r')
+        self.ids = np.load(ids_path(path), allow_pickle=True)
+        if self.matrix.shape != (len(self.ids), len(self.ids)):
+            raise ValueError(f"Matriks jalan {path} berukuran {self.matrix.shape}, id: {len(self.ids)}")
+        self.index = {nid: i for i, nid in enumerate(self.ids.tolist())}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getstate__(self):
+        # Jangan pickle isi memmap (mis. saat solver masuk ResultCache); buka ulang dari path
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def positions(self, node_ids):
+        return np.array([self.index.get(nid, -1) for nid in node_ids], dtype=np.int64)
+
+    def block(self, row_ids, col_ids):
+        # Sub-matriks float64 [len(row_ids), len(col_ids)]; NaN untuk id / pasangan yang tidak ada
+        rows, cols = self.positions(row_ids), self.positions(col_ids)
+        out = np.full((len(rows), len(cols)), np.nan)
+        vr, vc = np.flatnonzero(rows >= 0), np.flatnonzero(cols >= 0)
+        if len(vr) and len(vc):
+            # Baca per baris terurut agar akses memmap berurutan di disk
+            order = np.argsort(rows[vr], kind='stable')
+            col_pos = cols[vc]
+            for r in vr[order]:
+                out[r, vc] = self.matrix[rows[r], col_pos]
+        return out
+
+    def get(self, id_a, id_b):
+        i, j = self.index.get(id_a), self.index.get(id_b)
+        if i is None or j is None:
+            return None
+        value = float(self.matrix[i, j])
+        return None if np.isnan(value) else value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konversi ekspor OD (CSV panjang) ke matriks jalan float32 memory-mapped")
+    parser.add_argument('csv', help="CSV dengan kolom origin_id, dest_id, dan kolom nilai")
+    parser.add_argument('-o', '--output', required=True, help="File .npy tujuan (id ditulis ke <nama>.ids.npy)")
+    parser.add_argument('--value-col', default='distance_km')
+    args = parser.parse_args(argv)
+    n = from_od_csv(args.csv, args.output, args.value_col)
+    print(f"Matriks jalan {n} x {n} ditulis ke {args.output}")
+
+if __name__ == '__main__':
+    main()
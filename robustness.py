@@ -0,0 +1,253 @@
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import solver
+from parallel import SharedArrays, attach_shared
+from trace_log import TraceLog
+
+# Analisis robustness Monte Carlo: ribuan skenario gangguan (noise multiplier, fee, penutupan node / jalur)
+# diselesaikan paralel; geometri (NodeStore + matriks jarak) dihitung sekali dan dibagi lewat shared memory.
+
+DEFAULT_CONFIG = {
+    'land_sigma': 0.15, # Noise lognormal multiplier darat
+    'air_sigma': 0.30, # Noise lognormal multiplier udara (lonjakan biaya helikopter)
+    'fee_sigma': 0.20, # Noise lognormal landing fee per node
+    'node_closure': 0.02, # Peluang sebuah node (selain Stage 0) tidak bisa dijangkau
+    'edge_closure': 0.01, # Peluang sebuah leg (pasangan node berarah) tertutup
+}
+
+def sample_scenario(rng, base, config):
+    """
+    Satu skenario gangguan dari rng: multiplier, faktor fee per node, posisi node tertutup,
+    dan leg tertutup (baris, kolom). Setiap stage selalu menyisakan minimal satu node.
+    """
+    n = len(base.nodes)
+    stages = base.nodes.stages
+    land = base.cost_multipliers.get('land', 5000) * rng.lognormal(0.0, config['land_sigma'])
+    air = base.cost_multipliers.get('air', 50000) * rng.lognormal(0.0, config['air_sigma'])
+    fee_scale = rng.lognormal(0.0, config['fee_sigma'], size=n) if config['fee_sigma'] > 0 else None
+
+    closed = (rng.random(n) < config['node_closure']) & (stages != 0)
+    for stage in base.stages:
+        members = base.stage_positions[stage]
+        if closed[members].all():
+            closed[members[rng.integers(len(members))]] = False
+    # Jumlah leg tertutup ~ Binomial(n^2, p), lalu posisi diundi (tanpa matriks acak n x n)
+    k = rng.binomial(n * n, config['edge_closure']) if config['edge_closure'] > 0 else 0
+    rows, cols = rng.integers(n, size=k), rng.integers(n, size=k)
+    off_diag = rows != cols
+    return {'land': land, 'air': air, 'fee_scale': fee_scale, 'closed_nodes': np.flatnonzero(closed),
+            'closed_edges': (rows[off_diag], cols[off_diag])}
+
+def route_cost(instance, path_pos, closed_nodes):
+    # Biaya rute tetap di bawah skenario: node tertutup dilewati, leg tertutup -> inf
+    path_pos = np.asarray(path_pos, dtype=np.int64)
+    path_pos = path_pos[~np.isin(path_pos, closed_nodes)]
+    return float(instance.cost_matrix[path_pos[:-1], path_pos[1:]].sum())
+
+def solve_scenarios(base, indices, seed, config, candidates):
+    """
+    Selesaikan skenario `indices` (rng per skenario = default_rng([seed, i]) -> hasil tidak
+    bergantung pada jumlah worker / ukuran chunk). Return kolom sejajar per skenario.
+    """
+    out = {'scenario': [], 'land': [], 'air': [], 'closed_nodes': [], 'closed_edges': [],
+           'optimal_cost': [], 'route': [], 'candidate_cost': []}
+    for i in indices:
+        scenario = sample_scenario(np.random.default_rng([seed, i]), base, config)
+        instance = base.with_scenario({'land': scenario['land'], 'air': scenario['air']}, scenario['fee_scale'],
+                                      scenario['closed_nodes'], scenario['closed_edges'])
+        results = instance.get_recommendations(top_k=1)
+        feasible = bool(results) and np.isfinite(results[0]['total_cost'])
+        out['scenario'].append(int(i))
+        out['land'].append(scenario['land'])
+        out['air'].append(scenario['air'])
+        out['closed_nodes'].append(len(scenario['closed_nodes']))
+        out['closed_edges'].append(len(scenario['closed_edges'][0]))
+        out['optimal_cost'].append(float(results[0]['total_cost']) if feasible else np.inf)
+        out['route'].append(tuple(node['id'] for node in results[0]['full_path']) if feasible else None)
+        out['candidate_cost'].append([route_cost(instance, path_pos, scenario['closed_nodes']) for path_pos in candidates])
+    return out
+
+# Solver dasar per proses worker: geometri di-attach dari shared memory, bukan dihitung ulang
+_BASE = {}
+
+def _light_copy(base, local_search_budget):
+    # Salinan tanpa matriks N x N (dikirim ke worker lewat pickle, matriks lewat shared memory).
+    # Local search skenario dibatasi jumlah move saja (tanpa batas jam) -> reprodusibel dari seed
+    light = copy.copy(base)
+    light.local_search_budget, light.local_search_time_cap = local_search_budget, None
+    for name in ('dist_matrix', 'land_dist_matrix', 'land_cost_matrix', 'air_cost_matrix', 'cost_matrix'):
+        setattr(light, name, None)
+    light.trace = TraceLog('off')
+    light.profiler = solver.NULL_PROFILER
+    light.stage_tours, light.dp_table, light.cost_to_finish, light.kbest = {}, {}, {}, {}
+    return light
+
+def _attach(light, dist_matrix, land_dist_matrix):
+    light.dist_matrix, light.land_dist_matrix = dist_matrix, land_dist_matrix
+    light.apply_cost_multipliers()
+    return light
+
+def _init_worker(light, spec):
+    arrays = attach_shared(spec)
+    _BASE['solver'] = _attach(light, arrays['dist_matrix'], arrays['land_dist_matrix'])
+
+def _worker_task(indices, seed, config, candidates):
+    return solve_scenarios(_BASE['solver'], indices, seed, config, candidates)
+
+class RobustnessReport:
+    """
+    Hasil Monte Carlo: kolom per skenario (biaya optimal, rute pemenang, biaya kandidat),
+    frekuensi menang + distribusi biaya per rute, dan statistik rute kandidat (rekomendasi deterministik).
+    """
+    def __init__(self, scenarios, candidates, nodes, elapsed_s, workers):
+        self.elapsed_s = elapsed_s
+        self.workers = workers
+        self.nodes = nodes
+        self.candidates = candidates # list tuple id rute (top-k deterministik)
+        order = np.argsort(scenarios['scenario'])
+        self.scenario_ids = np.asarray(scenarios['scenario'])[order]
+        self.land = np.asarray(scenarios['land'])[order]
+        self.air = np.asarray(scenarios['air'])[order]
+        self.closed_nodes = np.asarray(scenarios['closed_nodes'])[order]
+        self.closed_edges = np.asarray(scenarios['closed_edges'])[order]
+        self.optimal_cost = np.asarray(scenarios['optimal_cost'], dtype=float)[order]
+        self.candidate_cost = np.asarray(scenarios['candidate_cost'], dtype=float).reshape(len(order), -1)[order]
+        winners = [scenarios['route'][i] for i in order]
+        self.routes = list(dict.fromkeys(route for route in winners if route is not None))
+        route_index = {route: r for r, route in enumerate(self.routes)}
+        self.route_ids = np.array([route_index.get(route, -1) for route in winners], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.scenario_ids)
+
+    @property
+    def feasible(self):
+        return np.isfinite(self.optimal_cost)
+
+    def route_label(self, route):
+        return " → ".join(self.nodes.name(nid) for nid in route)
+
+    def scenarios_frame(self):
+        return pd.DataFrame({
+            'scenario': self.scenario_ids, 'land': self.land, 'air': self.air,
+            'closed_nodes': self.closed_nodes, 'closed_edges': self.closed_edges,
+            'optimal_cost': self.optimal_cost, 'route_id': self.route_ids,
+        })
+
+    def routes_frame(self):
+        # Rute pemenang: frekuensi menang dan distribusi biaya optimal saat rute tersebut menang
+        rows = []
+        for r, route in enumerate(self.routes):
+            costs = self.optimal_cost[self.route_ids == r]
+            p5, p50, p95 = np.percentile(costs, [5, 50, 95])
+            rows.append({'route_id': r, 'wins': len(costs), 'win_rate': len(costs) / len(self),
+                         'cost_mean': costs.mean(), 'cost_p5': p5, 'cost_p50': p50, 'cost_p95': p95,
+                         'route': self.route_label(route)})
+        if not rows:
+            return pd.DataFrame(columns=['route_id', 'wins', 'win_rate', 'cost_mean', 'cost_p5', 'cost_p50', 'cost_p95', 'route'])
+        return pd.DataFrame(rows).sort_values('wins', ascending=False, ignore_index=True)
+
+    def candidates_frame(self):
+        """
+        Rute kandidat dievaluasi di SEMUA skenario (node tertutup dilewati): biaya rata-rata,
+        sebaran, p95, regret terhadap optimum skenario, dan frekuensi tetap optimal.
+        """
+        rows = []
+        ok = self.feasible
+        for c, route in enumerate(self.candidates):
+            cost = self.candidate_cost[:, c]
+            usable = ok & np.isfinite(cost)
+            values = cost[usable]
+            regret = values - self.optimal_cost[usable]
+            winner = self.routes.index(route) if route in self.routes else -2
+            rows.append({
+                'candidate': c + 1,
+                'cost_mean': values.mean() if len(values) else np.inf,
+                'cost_std': values.std() if len(values) else np.nan,
+                'cost_p95': np.percentile(values, 95) if len(values) else np.inf,
+                'regret_mean': regret.mean() if len(values) else np.inf,
+                'regret_p95': np.percentile(regret, 95) if len(values) else np.inf,
+                'win_rate': float((self.route_ids == winner).mean()),
+                'blocked_rate': float((ok & ~np.isfinite(cost)).mean()),
+                'route': self.route_label(route),
+            })
+        return pd.DataFrame(rows)
+
+    def to_dict(self):
+        return {
+            'scenarios': len(self), 'feasible': int(self.feasible.sum()), 'elapsed_s': self.elapsed_s,
+            'workers': self.workers, 'distinct_routes': len(self.routes),
+            'routes': self.routes_frame().to_dict('records'),
+            'candidates': self.candidates_frame().to_dict('records'),
+        }
+
+def run_robustness(base, n_scenarios=1000, seed=0, config=None, workers=None, candidates=3, chunk_size=None,
+                   local_search_budget=0.0):
+    """
+    Monte Carlo di atas solver `base` (multiplier base = titik tengah noise). candidates: jumlah
+    rekomendasi deterministik (top-k) yang dievaluasi di setiap skenario. workers=1 -> tanpa pool.
+    local_search_budget: budget local search per skenario (default 0 = greedy / Held-Karp saja);
+    selalu dibatasi jumlah move sehingga hasil sama untuk seed yang sama.
+    """
+    t0 = time.perf_counter()
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    light = _light_copy(base, local_search_budget)
+    deterministic = base.with_cost_multipliers(base.cost_multipliers).get_recommendations(top_k=candidates)
+    candidate_routes = [tuple(node['id'] for node in sol['full_path']) for sol in deterministic]
+    candidate_pos = [np.array([base.nodes.pos(nid) for nid in route], dtype=np.int64) for route in candidate_routes]
+
+    workers = workers or os.cpu_count()
+    indices = np.arange(n_scenarios)
+    if workers == 1:
+        columns = solve_scenarios(_attach(light, base.dist_matrix, base.land_dist_matrix), indices, seed, config, candidate_pos)
+    else:
+        chunk_size = chunk_size or max(1, min(64, n_scenarios // (workers * 4)))
+        columns = {}
+        with SharedArrays({'dist_matrix': base.dist_matrix, 'land_dist_matrix': base.land_dist_matrix}) as shared, \
+                ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(light, shared.spec)) as pool:
+            futures = [pool.submit(_worker_task, indices[lo:lo + chunk_size], seed, config, candidate_pos)
+                       for lo in range(0, n_scenarios, chunk_size)]
+            for fut in futures:
+                for key, values in fut.result().items():
+                    columns.setdefault(key, []).extend(values)
+    return RobustnessReport(columns, candidate_routes, base.nodes, time.perf_counter() - t0, workers)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analisis robustness Monte Carlo untuk rute OptiRelief")
+    parser.add_argument('data', nargs='?', default='data_lokasi_bencana.csv')
+    parser.add_argument('-n', '--scenarios', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--land', type=float, default=5000)
+    parser.add_argument('--air', type=float, default=50000)
+    for key, value in DEFAULT_CONFIG.items():
+        parser.add_argument('--' + key.replace('_', '-'), type=float, default=value)
+    parser.add_argument('--candidates', type=int, default=3, help="Jumlah rekomendasi deterministik yang dievaluasi")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses (default: semua core, 1 = tanpa pool)")
+    parser.add_argument('--local-search-budget', type=float, default=solver.LOCAL_SEARCH_BUDGET,
+                        help="Budget local search solver dasar (rekomendasi deterministik)")
+    parser.add_argument('--scenario-local-search-budget', type=float, default=0.0,
+                        help="Budget local search per skenario (0 = nonaktif)")
+    parser.add_argument('-o', '--output', help="Tulis kolom per skenario ke CSV")
+    args = parser.parse_args(argv)
+
+    base = solver.LogisticsSolver(pd.read_csv(args.data), cost_multipliers={'land': args.land, 'air': args.air},
+                                  local_search_budget=args.local_search_budget, trace_level='off')
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    report = run_robustness(base, args.scenarios, args.seed, config, args.workers, args.candidates,
+                            local_search_budget=args.scenario_local_search_budget)
+    if args.output:
+        report.scenarios_frame().to_csv(args.output, index=False)
+    print(json.dumps(report.to_dict(), indent=2, default=lambda v: v.item() if hasattr(v, 'item') else str(v)))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Pusat wilayah default per stage (mengikuti pola data_lokasi_bencana.csv: Aceh -> Sumbar -> Sumut -> Medan)
+DEFAULT_CENTERS = [
+    ('Aceh', 4.68, 96.85),
+    ('Sumbar', -0.85, 100.0),
+    ('Sumut', 2.9, 98.6),
+    ('Sumut', 3.6, 98.67),
+    ('Riau', 0.5, 101.45),
+    ('Jambi', -1.6, 103.6),
+    ('Bengkulu', -3.8, 102.3),
+    ('Lampung', -5.4, 105.26),
+]
+DEFAULT_DEPOT = ('Jakarta (Pusat Logistik)', 'DKI', -6.2088, 106.8456)
+
+def sample_base_fees(rng, n, distribution='lognormal', median=100_000_000, sigma=0.8, low=20_000_000, high=400_000_000):
+    # Distribusi biaya basis (IDR); nilai dibulatkan ke ribuan seperti data asli
+    if distribution == 'lognormal':
+        fees = rng.lognormal(np.log(median), sigma, n)
+    elif distribution == 'uniform':
+        fees = rng.uniform(low, high, n)
+    elif distribution == 'constant':
+        fees = np.full(n, float(median))
+    else:
+        raise ValueError(f"Distribusi biaya tidak dikenal: {distribution}")
+    return np.round(fees, -3)
+
+def generate_scenario(n_stages=4, nodes_per_stage=20, spread_km=60.0, seed=0, centers=None,
+                      fee_distribution='lognormal', fee_median=100_000_000, fee_sigma=0.8,
+                      fee_low=20_000_000, fee_high=400_000_000, depot=DEFAULT_DEPOT):
+    """
+    Bangkitkan skenario bencana sintetis yang reproducible (seed) dengan skema yang sama
+    seperti data_lokasi_bencana.csv. Node tiap stage disebar normal di sekitar pusat wilayah
+    dengan simpangan spread_km. nodes_per_stage boleh int atau list per stage.
+    """
+    rng = np.random.default_rng(seed)
+    centers = centers or DEFAULT_CENTERS
+    if np.isscalar(nodes_per_stage):
+        nodes_per_stage = [int(nodes_per_stage)] * n_stages
+    if len(nodes_per_stage) != n_stages:
+        raise ValueError("Panjang nodes_per_stage harus sama dengan n_stages")
+
+    depot_name, depot_prov, depot_lat, depot_lon = depot
+    rows = [{'id': 0, 'nama_lokasi': depot_name, 'stage_prioritas': 0, 'provinsi': depot_prov,
+             'lat': depot_lat, 'lon': depot_lon, 'biaya_basis_idr': 0}]
+    spread_deg = spread_km / 111.0
+    next_id = 1
+    for stage in range(1, n_stages + 1):
+        prov, c_lat, c_lon = centers[(stage - 1) % len(centers)]
+        n = nodes_per_stage[stage - 1]
+        lat = rng.normal(c_lat, spread_deg, n)
+        lon = rng.normal(c_lon, spread_deg / max(np.cos(np.radians(c_lat)), 0.1), n)
+        fees = sample_base_fees(rng, n, fee_distribution, fee_median, fee_sigma, fee_low, fee_high)
+        for k in range(n):
+            rows.append({'id': next_id, 'nama_lokasi': f"{prov} S{stage}-{k + 1:04d}", 'stage_prioritas': stage,
+                         'provinsi': prov, 'lat': round(float(lat[k]), 4), 'lon': round(float(lon[k]), 4),
+                         'biaya_basis_idr': int(fees[k])})
+            next_id += 1
+    return pd.DataFrame(rows, columns=['id', 'nama_lokasi', 'stage_prioritas', 'provinsi', 'lat', 'lon', 'biaya_basis_idr'])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generator skenario bencana sintetis (format data_lokasi_bencana.csv)")
+    parser.add_argument('--stages', type=int, default=4)
+    parser.add_argument('--nodes', type=int, nargs='+', default=[20], help="Node per stage (satu nilai atau satu per stage)")
+    parser.add_argument('--spread-km', type=float, default=60.0)
+    parser.add_argument('--fee-distribution', choices=['lognormal', 'uniform', 'constant'], default='lognormal')
+    parser.add_argument('--fee-median', type=float, default=100_000_000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', required=True)
+    args = parser.parse_args(argv)
+
+    nodes = args.nodes[0] if len(args.nodes) == 1 else args.nodes
+    df = generate_scenario(args.stages, nodes, args.spread_km, args.seed,
+                           fee_distribution=args.fee_distribution, fee_median=args.fee_median)
+    df.to_csv(args.output, index=False)
+    print(f"{len(df)} lokasi ditulis ke {args.output}")
+
+if __name__ == '__main__':
+    main()
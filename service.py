@@ -0,0 +1,251 @@
+import argparse
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import result_cache
+import solver
+
+# Layanan HTTP lokal (asyncio murni, tanpa dependensi eksternal) di atas LogisticsSolver.get_recommendations
+
+# Batas atas top_k per request (k-best DP: memori & waktu linear terhadap k)
+MAX_TOP_K = 100
+
+# --- Sisi worker (per proses executor) ---
+# Solver dasar per dataset (NodeStore + dist_matrix sudah dihitung); clone per multiplier murah
+# (with_cost_multipliers memakai ulang geometri), hasil berulang sudah ditangkap ResultCache
+_BASE = {}
+
+def _base_solver(path, mtime):
+    key = (path, mtime)
+    if key not in _BASE:
+        _BASE[key] = solver.LogisticsSolver(pd.read_csv(path), trace_level='off')
+    return _BASE[key]
+
+def serialize_results(results):
+    solutions = []
+    for rank, sol in enumerate(results, start=1):
+        route_ids = [node['id'] for node in sol['full_path']]
+        solutions.append({
+            'rank': rank,
+            'total_cost': float(sol['total_cost']),
+            'route_ids': route_ids,
+            'route_names': [node['nama_lokasi'] for node in sol['full_path']],
+            'legs': sol['legs'],
+        })
+    return solutions
+
+def solve_request(path, mtime, land, air, top_k):
+    t0 = time.perf_counter()
+    instance = _base_solver(path, mtime).with_cost_multipliers({'land': land, 'air': air})
+    results = instance.get_recommendations(top_k=top_k)
+    return {'solutions': serialize_results(results), 'solve_s': time.perf_counter() - t0}
+
+def warm_dataset(path, mtime):
+    _base_solver(path, mtime)
+    return os.getpid()
+
+# --- Sisi event loop ---
+class LatencyStats:
+    # Latensi end-to-end per request (jendela terakhir `window` request) + counter
+    def __init__(self, window=10_000):
+        self.samples = deque(maxlen=window)
+        self.counters = {'requests': 0, 'solves': 0, 'coalesced': 0, 'cache_hits': 0, 'errors': 0}
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+
+    def snapshot(self):
+        data = np.array(self.samples) * 1000
+        latency = {'count': len(data)}
+        if len(data):
+            p50, p90, p95, p99 = np.percentile(data, [50, 90, 95, 99])
+            latency.update({'mean_ms': float(data.mean()), 'p50_ms': float(p50), 'p90_ms': float(p90),
+                            'p95_ms': float(p95), 'p99_ms': float(p99), 'max_ms': float(data.max())})
+        return {'latency': latency, **self.counters}
+
+class BadRequest(ValueError):
+    pass
+
+class SolveService:
+    """
+    Request identik yang sedang berjalan (dataset, land, air, top_k) digabung ke satu future;
+    solve CPU-bound dijalankan di process pool (worker menyimpan solver warm per dataset),
+    hasil yang sudah jadi disimpan di ResultCache.
+    """
+    def __init__(self, datasets, workers=None, cache_mb=64):
+        self.datasets = dict(datasets)
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.cache = result_cache.ResultCache(max_bytes=int(cache_mb * 1024 * 1024))
+        self.inflight = {}
+        self.stats = LatencyStats()
+
+    def _dataset(self, name):
+        if name not in self.datasets:
+            raise BadRequest(f"Dataset tidak dikenal: {name} (tersedia: {', '.join(self.datasets)})")
+        path = self.datasets[name]
+        return path, os.path.getmtime(path)
+
+    async def prewarm(self):
+        # Best effort: satu task per worker agar tiap proses memuat dataset sebelum request pertama
+        loop = asyncio.get_running_loop()
+        for path in self.datasets.values():
+            mtime = os.path.getmtime(path)
+            await asyncio.gather(*(loop.run_in_executor(self.executor, warm_dataset, path, mtime)
+                                   for _ in range(self.workers)))
+
+    async def solve(self, params):
+        try:
+            name = params.get('dataset', 'default')
+            land = float(params.get('land', 5000))
+            air = float(params.get('air', 50000))
+            top_k = int(params.get('top_k', 1))
+        except (TypeError, ValueError) as exc:
+            raise BadRequest(f"Parameter tidak valid: {exc}")
+        if not (1 <= top_k <= MAX_TOP_K):
+            raise BadRequest(f"top_k harus antara 1 dan {MAX_TOP_K}")
+        if not all(math.isfinite(v) and v > 0 for v in (land, air)):
+            raise BadRequest("land dan air harus bilangan berhingga > 0")
+        path, mtime = self._dataset(name)
+
+        cache_key = result_cache.make_key(f"{name}:{mtime}", {'land': land, 'air': air}, top_k)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            self.stats.counters['cache_hits'] += 1
+            return {**cached, 'source': 'cache'}
+
+        key = (name, mtime, land, air, top_k)
+        if key in self.inflight:
+            self.stats.counters['coalesced'] += 1
+            result = await asyncio.shield(self.inflight[key])
+            return {**result, 'source': 'coalesced'}
+
+        future = asyncio.get_running_loop().run_in_executor(
+            self.executor, solve_request, path, mtime, land, air, top_k)
+        self.inflight[key] = future
+        try:
+            result = await future
+        finally:
+            del self.inflight[key]
+        self.stats.counters['solves'] += 1
+        result = {'dataset': name, 'land': land, 'air': air, 'top_k': top_k, **result}
+        self.cache.put(cache_key, result)
+        return {**result, 'source': 'solve'}
+
+    async def route(self, method, target, body):
+        url = urlsplit(target)
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'workers': self.workers, 'inflight': len(self.inflight)}
+        if url.path == '/datasets':
+            return 200, {'datasets': self.datasets}
+        if url.path == '/stats':
+            return 200, {**self.stats.snapshot(), 'inflight': len(self.inflight), 'cache': dict(self.cache.stats)}
+        if url.path == '/solve':
+            if method == 'GET':
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            elif method == 'POST':
+                try:
+                    params = json.loads(body or b'{}')
+                except ValueError as exc: # JSONDecodeError / UnicodeDecodeError
+                    raise BadRequest(f"Body JSON tidak valid: {exc}")
+                if not isinstance(params, dict):
+                    raise BadRequest(f"Body JSON harus berupa object, bukan {type(params).__name__}")
+            else:
+                return 405, {'error': f"Method {method} tidak didukung"}
+            return 200, await self.solve(params)
+        return 404, {'error': f"Path tidak ditemukan: {url.path}"}
+
+    async def handle_client(self, reader, writer):
+        # HTTP/1.1 minimal dengan keep-alive (cukup untuk klien lokal / load test)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                t0 = time.perf_counter()
+                self.stats.counters['requests'] += 1
+                try:
+                    status, payload = await self.route(method.upper(), target, body)
+                except BadRequest as exc:
+                    status, payload = 400, {'error': str(exc)}
+                except Exception as exc:
+                    status, payload = 500, {'error': f"{type(exc).__name__}: {exc}"}
+                if status >= 400:
+                    self.stats.counters['errors'] += 1
+                elif target.startswith('/solve'):
+                    self.stats.add(time.perf_counter() - t0)
+
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                data = json.dumps(payload, default=lambda v: v.item() if hasattr(v, 'item') else str(v)).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                    f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, prewarm=True):
+        if prewarm:
+            await self.prewarm()
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"OptiRelief service di http://{host}:{port} ({self.workers} worker, dataset: {', '.join(self.datasets)})")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+def parse_datasets(items):
+    datasets = {}
+    for item in items:
+        name, sep, path = item.partition('=')
+        if not sep:
+            name, path = os.path.splitext(os.path.basename(item))[0], item
+        datasets[name] = path
+    return datasets
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Layanan HTTP lokal untuk LogisticsSolver (asyncio, tanpa dependensi eksternal)")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dataset', action='append', default=[], help="nama=path.csv (boleh berulang)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-mb', type=float, default=64)
+    parser.add_argument('--no-prewarm', action='store_true')
+    args = parser.parse_args(argv)
+
+    datasets = parse_datasets(args.dataset) if args.dataset else {'default': 'data_lokasi_bencana.csv'}
+    service = SolveService(datasets, args.workers, args.cache_mb)
+    try:
+        asyncio.run(service.serve(args.host, args.port, prewarm=not args.no_prewarm))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+
+if __name__ == '__main__':
+    main()
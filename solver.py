@@ -1,16 +1,647 @@
 import pandas as pd
 import numpy as np
+import copy
+import heapq
 import itertools
 import math
+import time
+from local_search import neighbour_lists, improve_open_path, move_cap
+from spatial_index import SpatialIndex
+from profiling import SolveProfiler, NULL_PROFILER
+from road_matrix import RoadMatrix
+from trace_log import TraceLog, TRACE_DECISIONS, KIND_BASE, KIND_RECURSIVE, KIND_FINAL, KIND_CANDIDATE
+
+EARTH_RADIUS_KM = 6371
+
+# Batas default mode eksak Held-Karp (2^n * n * n state per stage)
+EXACT_MAX_NODES = 15
+EXACT_MEMORY_LIMIT = 512 * 1024 * 1024
+# Budget local search 2-opt/Or-opt per stage heuristik (detik, dikonversi ke jumlah evaluasi move)
+LOCAL_SEARCH_BUDGET = 0.5
+# Stage heuristik dengan node >= batas ini memakai spatial index (k tetangga terdekat) untuk greedy
+SPATIAL_INDEX_MIN_NODES = 1000
+# Jumlah kandidat tetangga per node yang diperiksa greedy ter-pangkas sebelum fallback ke baris penuh
+GREEDY_CANDIDATES = 16
+
+def haversine_matrix(lat_a, lon_a, lat_b, lon_b):
+    # Versi vektor dari calculate_haversine: jarak (km) semua pasangan a x b sekaligus
+    phi_a = np.radians(np.asarray(lat_a, dtype=float))[:, None]
+    phi_b = np.radians(np.asarray(lat_b, dtype=float))[None, :]
+    dphi = phi_b - phi_a
+    dlambda = np.radians(np.asarray(lon_b, dtype=float))[None, :] - np.radians(np.asarray(lon_a, dtype=float))[:, None]
+    a = np.sin(dphi/2)**2 + np.cos(phi_a)*np.cos(phi_b)*np.sin(dlambda/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1-a))
+    return EARTH_RADIUS_KM * c
+
+def held_karp_memory_bytes(n):
+    # dp float64 + parent int8 untuk state [mask, start, end]
+    return (1 << n) * n * n * (8 + 1)
+
+def held_karp_open_paths(cost):
+    """
+    Bitmask DP untuk Open-TSP (Hamiltonian path) pada matriks biaya n x n.
+    Semua titik awal diproses sekaligus (vektor NumPy), sehingga satu pass memberi
+    biaya optimal untuk setiap pasangan (entry, exit).
+    Return: (best[start, end], parent[mask, start, end]).
+    """
+    n = len(cost)
+    full = 1 << n
+    dp = np.full((full, n, n), np.inf)
+    parent = np.full((full, n, n), -1, dtype=np.int8)
+    idx = np.arange(n)
+    dp[1 << idx, idx, idx] = 0
+
+    masks = np.arange(full)
+    popcount = np.zeros(full, dtype=np.int64)
+    for b in range(n):
+        popcount += (masks >> b) & 1
+
+    # Proses per ukuran subset: semua mask dengan jumlah node yang sama diproses bersamaan
+    for size in range(2, n + 1):
+        layer = masks[popcount == size]
+        for j in range(n):
+            sel = layer[(layer >> j) & 1 == 1]
+            prev = sel ^ (1 << j)
+            cand = dp[prev] + cost[:, j][None, None, :]
+            best = cand.argmin(axis=2)
+            dp[sel, :, j] = np.take_along_axis(cand, best[..., None], axis=2)[..., 0]
+            parent[sel, :, j] = best
+
+    return dp[full - 1], parent
+
+class StageTours:
+    # Tabel tur lokal satu stage: biaya untuk setiap pasangan (entry, exit) + cara rekonstruksi path
+    def __init__(self, stage, positions, cost, method):
+        self.stage = stage
+        self.positions = positions # posisi global (NodeStore) dari node di stage ini
+        self.cost = cost # [entry_local, exit_local], inf jika pasangan tidak tersedia
+        self.method = method
+        self.parent = None # Held-Karp back-pointer
+        # Heuristik: satu path per entry sebagai array int32 [baris, m] (bukan dict of list: m^2 int Python)
+        self.paths = None
+        self.entries = None # entry lokal per baris paths (None = baris i adalah entry i)
+        self.exits = None # exit lokal per baris paths
+        self.savings = np.zeros(len(positions)) # Penghematan local search per entry
+        self.runtime_s = 0.0
+        self.memory_bytes = 0
+        self.evaluations = 0 # Jumlah evaluasi biaya edge saat membangun tur
+
+    def local_path(self, entry, exit_):
+        if self.parent is None:
+            row = entry if self.entries is None else int(np.searchsorted(self.entries, entry))
+            if row >= len(self.exits) or self.exits[row] != exit_ or (self.entries is not None and self.entries[row] != entry):
+                raise KeyError((entry, exit_))
+            return self.paths[row].tolist()
+        n = len(self.positions)
+        mask = (1 << n) - 1
+        cur = exit_
+        path = [cur]
+        while mask != (1 << entry):
+            prev = int(self.parent[mask, entry, cur])
+            mask ^= 1 << cur
+            cur = prev
+            path.append(cur)
+        return path[::-1]
+
+    def path_positions(self, entry, exit_):
+        return self.positions[self.local_path(entry, exit_)].tolist()
+
+    @staticmethod
+    def merge(parts):
+        # Gabungkan potongan hasil (subset entry berbeda) dari stage yang sama
+        tours = StageTours(parts[0].stage, parts[0].positions, np.full_like(parts[0].cost, np.inf), parts[0].method)
+        m = len(tours.positions)
+        if parts[0].paths is not None:
+            tours.paths = np.empty((m, m), dtype=np.int32)
+            tours.exits = np.full(m, -1, dtype=np.int32)
+        for part in parts:
+            tours.cost = np.minimum(tours.cost, part.cost)
+            if part.paths is not None:
+                rows = slice(None) if part.entries is None else part.entries
+                tours.paths[rows] = part.paths
+                tours.exits[rows] = part.exits
+            tours.savings += part.savings
+            tours.runtime_s += part.runtime_s
+            tours.evaluations += part.evaluations
+            tours.memory_bytes = max(tours.memory_bytes, part.memory_bytes)
+        return tours
+
+def batched_greedy_open_paths(cost, starts=None, candidates=None):
+    """
+    Greedy Nearest Neighbor untuk SEMUA entry sekaligus pada matriks biaya stage (m x m).
+    Setiap baris adalah satu tur yang dimulai dari entry ke-i; semua tur maju bersama
+    dengan operasi array ber-mask. starts membatasi entry yang dihitung (default semua).
+    Jika semua kandidat dari node saat ini tertutup (biaya inf), tur tetap dilanjutkan ke node
+    belum dikunjungi berikutnya agar path tetap permutasi yang valid, tetapi biayanya menjadi inf.
+    candidates: daftar tetangga per node [m, k] terurut dari yang termurah. Setiap langkah cukup
+    memeriksa kandidat pertama yang belum dikunjungi (dan tidak inf); hanya baris yang semua
+    kandidatnya habis yang memindai baris biaya penuh. Hasil sama dengan tanpa candidates.
+    Return: (biaya[r], path[r, m], exit[r], jumlah evaluasi biaya edge).
+    """
+    m = len(cost)
+    starts = np.arange(m) if starts is None else np.asarray(starts)
+    rows = np.arange(len(starts))
+    visited = np.zeros((len(starts), m), dtype=bool)
+    visited[rows, starts] = True
+    paths = np.empty((len(starts), m), dtype=np.int32)
+    paths[:, 0] = starts
+    totals = np.zeros(len(starts))
+    current = starts
+    evaluations = 0
+    for step in range(1, m):
+        if candidates is None:
+            full, nxt, best = rows, None, None
+        else:
+            near = candidates[current]
+            near_cost = cost[current[:, None], near]
+            usable = ~visited[rows[:, None], near] & np.isfinite(near_cost)
+            first = usable.argmax(axis=1)
+            nxt, best = near[rows, first], near_cost[rows, first]
+            full = np.flatnonzero(~usable[rows, first])
+            evaluations += near.size
+        if len(full):
+            # Scan baris biaya penuh (semua baris, atau baris yang kandidatnya habis)
+            mask = visited if full is rows else visited[full]
+            step_cost = np.where(mask, np.inf, cost[current[full]])
+            full_nxt = step_cost.argmin(axis=1)
+            full_best = step_cost[np.arange(len(full)), full_nxt]
+            # Semua kandidat inf -> argmin bisa jatuh ke node yang sudah dikunjungi; ambil yang belum
+            dead = ~np.isfinite(full_best)
+            if dead.any():
+                full_nxt[dead] = (~mask[dead]).argmax(axis=1)
+            if full is rows:
+                nxt, best = full_nxt, full_best
+            else:
+                nxt[full], best[full] = full_nxt, full_best
+            evaluations += len(full) * m
+        totals += best
+        visited[rows, nxt] = True
+        paths[:, step] = nxt
+        current = nxt
+    return totals, paths, paths[:, -1], evaluations
+
+def improve_stage_tours(tours, sub_cost, budget, neighbours, nbrs=None, time_cap=None):
+    # 2-opt / Or-opt setelah konstruksi; setiap entry mendapat jatah evaluasi move setara budget/m detik
+    # (deterministik: serial == paralel). time_cap (detik, opsional): batas luar wall-clock per stage
+    if nbrs is None:
+        nbrs = neighbour_lists(sub_cost, neighbours)
+    m = len(tours.positions)
+    max_moves = move_cap(budget, m)
+    entries = range(len(tours.paths)) if tours.entries is None else tours.entries.tolist()
+    for row, i in enumerate(entries):
+        j = int(tours.exits[row])
+        if not np.isfinite(tours.cost[i, j]):
+            continue # tur tidak layak (edge tertutup): delta biaya inf - inf tidak bermakna
+        deadline = None if time_cap is None else time.perf_counter() + time_cap / m
+        # Hanya path yang sedang diperbaiki yang dijadikan list Python
+        new_path, saved, moves = improve_open_path(tours.paths[row].tolist(), sub_cost, nbrs, max_moves, deadline)
+        tours.evaluations += moves
+        if saved <= 0:
+            continue
+        new_j = new_path[-1]
+        tours.cost[i, new_j] = tours.cost[i, j] - saved
+        if new_j != j:
+            tours.cost[i, j] = np.inf
+        tours.paths[row] = new_path
+        tours.exits[row] = new_j
+        tours.savings[i] = saved
+    tours.method = 'greedy+2opt/oropt'
+
+def exact_stage_tours(stage_id, positions, sub_cost):
+    t0 = time.perf_counter()
+    best, parent = held_karp_open_paths(sub_cost)
+    tours = StageTours(stage_id, positions, best, 'held-karp')
+    tours.parent = parent
+    tours.runtime_s = time.perf_counter() - t0
+    tours.memory_bytes = held_karp_memory_bytes(len(positions))
+    n = len(positions)
+    tours.evaluations = n ** 3 * ((1 << (n - 1)) - 1) if n > 1 else 0
+    return tours
+
+def heuristic_stage_tours(stage_id, positions, sub_cost, local_search_budget, neighbours, entries=None, coords=None,
+                          time_cap=None):
+    # entries: subset baris entry (lokal) yang dihitung; None = semua entry di stage
+    # coords: (lat, lon) node stage -> kandidat greedy & neighbour list lewat SpatialIndex (stage besar)
+    # time_cap: batas wall-clock opsional untuk local search (hanya jalur serial)
+    t0 = time.perf_counter()
+    m = len(positions)
+    starts = np.arange(m) if entries is None else np.asarray(entries)
+    tours = StageTours(stage_id, positions, np.full((m, m), np.inf), 'greedy')
+    nbrs = candidates = None
+    if coords is not None:
+        # Biaya intra-stage = land * haversine, jadi tetangga terdekat geografis = termurah:
+        # daftar kNN memangkas setiap langkah greedy ter-batch ke beberapa kolom saja
+        index = SpatialIndex(*coords)
+        candidates = index.neighbour_lists(max(GREEDY_CANDIDATES, neighbours))
+        nbrs = candidates[:, :neighbours]
+        tours.method = 'greedy(spatial-index)'
+        tours.evaluations = index.distance_evaluations
+    # Konstruksi greedy untuk semua entry dalam satu loop ter-vektor
+    totals, paths, exits, evaluations = batched_greedy_open_paths(sub_cost, starts, candidates)
+    tours.evaluations += evaluations
+    tours.cost[starts, exits] = totals
+    tours.paths, tours.exits = paths, exits.copy()
+    tours.entries = None if entries is None else starts
+    if local_search_budget > 0 and m > 2:
+        improve_stage_tours(tours, sub_cost, local_search_budget, neighbours, nbrs, time_cap)
+    tours.runtime_s = time.perf_counter() - t0
+    tours.memory_bytes = tours.cost.nbytes + tours.paths.nbytes
+    return tours
+
+def min_plus_transition(local_cost, transit, future):
+    """
+    Transisi stage sebagai operasi (min,+) ter-batch:
+        total[e] = min_{x, n} local_cost[e, x] + transit[x, n] + future[n]
+    Return: (total, exit terbaik, next entry terbaik) untuk setiap entry e.
+    """
+    via_exit = transit + future[None, :]
+    exit_next = via_exit.argmin(axis=1)
+    exit_best = via_exit[np.arange(len(via_exit)), exit_next]
+    total = local_cost + exit_best[None, :]
+    best_exit = total.argmin(axis=1)
+    best_total = total[np.arange(len(total)), best_exit]
+    return best_total, best_exit, exit_next[best_exit]
+
+def kbest_merge(offset, lists, k):
+    """
+    k-best (min,+) antara offset [R, C] dan daftar terurut per kolom lists [C, K] (pad inf):
+        kandidat baris r = offset[r, c] + lists[c, j] untuk semua (c, j).
+    Hanya kolom dengan head (j = 0) di k terkecil yang mungkin masuk top-k, sisanya dipangkas
+    (argpartition); kolom tersisa digabung dengan heap sehingga biaya per baris O(C + k log k).
+    Return: (nilai [R, k], kolom [R, k], rank dalam daftar kolom [R, k]); slot kosong = inf / -1.
+    """
+    rows, cols = offset.shape
+    depth = lists.shape[1]
+    head = offset + lists[None, :, 0]
+    if k < cols:
+        candidates = np.argpartition(head, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(cols), (rows, cols))
+    values = np.full((rows, k), np.inf)
+    col_out = np.full((rows, k), -1, dtype=np.int64)
+    rank_out = np.full((rows, k), -1, dtype=np.int64)
+    for r in range(rows):
+        row_offset = offset[r]
+        heap = [(head[r, c], c, 0) for c in candidates[r].tolist()]
+        heapq.heapify(heap)
+        for out in range(k):
+            if not heap or not np.isfinite(heap[0][0]):
+                break
+            value, c, j = heapq.heappop(heap)
+            values[r, out], col_out[r, out], rank_out[r, out] = value, c, j
+            if j + 1 < depth:
+                heapq.heappush(heap, (row_offset[c] + lists[c, j + 1], c, j + 1))
+    return values, col_out, rank_out
+
+class SweepResult:
+    # Hasil sweep (land x air): biaya optimal, indeks rute per titik grid, dan breakpoint
+    def __init__(self, land_values, air_values, costs, route_ids, routes):
+        self.land_values = land_values
+        self.air_values = air_values
+        self.costs = costs # [n_land, n_air]
+        self.route_ids = route_ids # [n_land, n_air] -> indeks ke self.routes
+        self.routes = routes # list path (list id node)
+        self.breakpoints = self._find_breakpoints()
+
+    def _find_breakpoints(self):
+        # Titik grid bertetangga yang rute optimalnya berbeda (sepanjang sumbu land / air)
+        points = []
+        ids = self.route_ids
+        for i, j in zip(*np.nonzero(ids[1:, :] != ids[:-1, :])):
+            points.append({'axis': 'land', 'land_from': float(self.land_values[i]), 'land_to': float(self.land_values[i + 1]),
+                           'air': float(self.air_values[j]), 'route_from': int(ids[i, j]), 'route_to': int(ids[i + 1, j])})
+        for i, j in zip(*np.nonzero(ids[:, 1:] != ids[:, :-1])):
+            points.append({'axis': 'air', 'land': float(self.land_values[i]), 'air_from': float(self.air_values[j]),
+                           'air_to': float(self.air_values[j + 1]), 'route_from': int(ids[i, j]), 'route_to': int(ids[i, j + 1])})
+        return points
+
+    def to_frame(self):
+        land, air = np.meshgrid(self.land_values, self.air_values, indexing='ij')
+        return pd.DataFrame({
+            'land': land.ravel(),
+            'air': air.ravel(),
+            'total_cost': self.costs.ravel(),
+            'route_id': self.route_ids.ravel(),
+        })
+
+# Tabel DP sebagai record array: satu baris per state; entry/exit/next = posisi di NodeStore (-1 = finish)
+DP_DTYPE = np.dtype([
+    ('stage', np.int32), ('entry', np.int64), ('exit', np.int64), ('next', np.int64),
+    ('cost_to_finish', np.float64), ('local_saving', np.float64),
+])
+
+NODE_FIELDS = ('id', 'nama_lokasi', 'stage_prioritas', 'provinsi', 'lat', 'lon', 'biaya_basis_idr')
+
+class NodeRecord:
+    # Record ringan pengganti row.to_dict(); tetap bisa diakses seperti dict (node['lat'])
+    __slots__ = NODE_FIELDS
+
+    def __init__(self, *values):
+        for field, value in zip(NODE_FIELDS, values):
+            setattr(self, field, value)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in NODE_FIELDS
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if key in NODE_FIELDS else default
+
+    def keys(self):
+        return NODE_FIELDS
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in NODE_FIELDS}
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in NODE_FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(NODE_FIELDS, state):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return f"NodeRecord(id={self.id!r}, nama_lokasi={self.nama_lokasi!r}, stage={self.stage_prioritas})"
+
+class NodeStore:
+    # Penyimpanan node berbasis array kolom + index id -> posisi (lookup O(1))
+    def __init__(self, df):
+        self.ids = df['id'].to_numpy()
+        self.names = df['nama_lokasi'].astype(str).to_numpy()
+        self.stages = df['stage_prioritas'].to_numpy()
+        self.provinces = df['provinsi'].to_numpy() if 'provinsi' in df.columns else np.full(len(df), '', dtype=object)
+        self.lat = df['lat'].to_numpy(dtype=float)
+        self.lon = df['lon'].to_numpy(dtype=float)
+        if 'biaya_basis_idr' in df.columns:
+            self.base_fee = df['biaya_basis_idr'].fillna(0).to_numpy(dtype=float)
+        else:
+            self.base_fee = np.zeros(len(df))
+        self.index = {nid: i for i, nid in enumerate(self.ids.tolist())}
+        self._records = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def pos(self, node_id):
+        return self.index[node_id]
+
+    def id_at(self, pos):
+        return self.ids[pos].item() if hasattr(self.ids[pos], 'item') else self.ids[pos]
+
+    def name(self, node_id):
+        return self.names[self.index[node_id]]
+
+    def stage(self, node_id):
+        return self.stages[self.index[node_id]]
+
+    def record(self, pos):
+        if self._records is None:
+            ids = self.ids.tolist()
+            self._records = [
+                NodeRecord(ids[i], self.names[i], self.stages[i].item(), self.provinces[i],
+                           self.lat[i].item(), self.lon[i].item(), self.base_fee[i].item())
+                for i in range(len(self.ids))
+            ]
+        return self._records[pos]
+
+    def get(self, node_id):
+        pos = self.index.get(node_id)
+        return None if pos is None else self.record(pos)
+
+class CountingNodeStore(NodeStore):
+    # NodeStore yang menghitung lookup ke profiler ('node_lookups'); hanya dipakai saat profile=True
+    # sehingga NodeStore biasa tetap tanpa overhead
+    def __init__(self, df, profiler):
+        super().__init__(df)
+        self.profiler = profiler
+
+    def pos(self, node_id):
+        self.profiler.count('node_lookups')
+        return super().pos(node_id)
+
+    def id_at(self, pos):
+        self.profiler.count('node_lookups')
+        return super().id_at(pos)
+
+    def name(self, node_id):
+        self.profiler.count('node_lookups')
+        return super().name(node_id)
+
+    def stage(self, node_id):
+        self.profiler.count('node_lookups')
+        return super().stage(node_id)
+
+    def record(self, pos):
+        self.profiler.count('node_lookups')
+        return super().record(pos)
+
+class SolveSummary:
+    """
+    Hasil satu solve dalam bentuk ringan untuk cache / pickle: rekomendasi top-k plus array
+    kecil yang dibaca UI (NodeStore, tabel DP bertipe, trace, statistik stage & profiling).
+    Tanpa matriks biaya N x N, tabel Held-Karp, maupun tur lokal; analisis yang butuh itu
+    (perbandingan depot, sweep, robustness) tetap memakai LogisticsSolver.
+    """
+    def __init__(self, instance, results):
+        self.results = results
+        self.nodes = instance.nodes
+        self.stage_positions = {s: np.array(pos) for s, pos in instance.stage_positions.items()}
+        self.dp = instance.dp_records()
+        self.trace = instance.trace
+        self.stage_stats = instance.stage_stats
+        self.profile_report = instance.profile_report
+        self.road_stats = instance.road_stats
+
+    def stage_node_ids(self, stage_id):
+        return [self.nodes.id_at(p) for p in self.stage_positions.get(stage_id, [])]
+
+    def dp_records(self):
+        return self.dp
+
+    def trace_lookup(self, stage, node_id):
+        pos = self.nodes.index.get(node_id)
+        rec = None if pos is None else self.trace.lookup(stage, pos)
+        return None if rec is None else self.trace.render(rec, self.nodes)
 
 class LogisticsSolver:
-    def __init__(self, df, cost_multipliers=None):
+    def __init__(self, df, cost_multipliers=None, exact_max_nodes=EXACT_MAX_NODES, exact_memory_limit=EXACT_MEMORY_LIMIT,
+                 local_search_budget=LOCAL_SEARCH_BUDGET, local_search_neighbours=8, local_search_time_cap=None, workers=None,
+                 spatial_index_min_nodes=SPATIAL_INDEX_MIN_NODES, profile=False,
+                 trace_level=TRACE_DECISIONS, trace_capacity=100_000, trace_spill_path=None, road_matrix=None):
         self.df = df
         self.cost_multipliers = cost_multipliers if cost_multipliers else {'land': 5000, 'air': 50000}
         # Identify Stages, excluding 0 (Jakarta/Start) from the recursive stages
         self.stages = sorted(df['stage_prioritas'].unique())
         if 0 in self.stages: self.stages.remove(0)
-        self.steps_log = [] # <--- FITUR BARU: Menyimpan jejak perhitungan
+        # Jejak perhitungan (off / decisions / full) sebagai record numerik, dirender ke teks saat dibaca
+        self.trace = TraceLog(trace_level, trace_capacity, trace_spill_path)
+        # Stage dengan node <= exact_max_nodes diselesaikan eksak (Held-Karp), sisanya heuristik
+        self.exact_max_nodes = exact_max_nodes
+        self.exact_memory_limit = exact_memory_limit
+        # Budget local search per stage (0 = nonaktif), trade-off latency vs kualitas rute.
+        # Dikonversi ke jumlah evaluasi move (deterministik); local_search_time_cap (detik, opsional)
+        # menambah batas wall-clock per stage di jalur serial (hasil tidak lagi reprodusibel)
+        self.local_search_budget = local_search_budget
+        self.local_search_neighbours = local_search_neighbours
+        self.local_search_time_cap = local_search_time_cap
+        # Opt-in: jumlah proses untuk menghitung tur lokal per stage/entry secara paralel
+        self.workers = workers
+        self.spatial_index_min_nodes = spatial_index_min_nodes
+        self.stage_stats = {}
+        self.stage_tours = {}
+        self.dp_table = {}
+        self.cost_to_finish = {}
+        self.kbest = {}
+        # Jumlah evaluasi biaya edge per fase (matriks, tur lokal, transisi DP, start)
+        self.cost_evaluations = {'matrix': 0, 'stage_tours': 0, 'transition': 0, 'start': 0}
+        # Opt-in: timer per fase + counter hot-path (NullProfiler = no-op saat nonaktif)
+        self.profiler = SolveProfiler() if profile else NULL_PROFILER
+        self.profile_report = None
+        # Opsional: matriks jarak jalan (path .npy / RoadMatrix) untuk biaya darat, haversine sebagai fallback
+        self.road_matrix = RoadMatrix(road_matrix) if isinstance(road_matrix, str) else road_matrix
+        self.nodes = self._node_store(df)
+        self.build_cost_matrices()
+
+    def _node_store(self, df):
+        return CountingNodeStore(df, self.profiler) if self.profiler.enabled else NodeStore(df)
+
+    def build_cost_matrices(self, previous=None):
+        # Precompute semua biaya edge sekali saja (N x N), lalu semua jalur solver cukup indexing
+        # previous = (old_pos, old_dist): pakai ulang blok jarak node lama, hitung baris baru saja
+        nodes = self.nodes
+
+        if previous is None:
+            self.dist_matrix = haversine_matrix(nodes.lat, nodes.lon, nodes.lat, nodes.lon)
+            self.cost_evaluations['matrix'] += len(nodes) ** 2
+        else:
+            old_pos, old_dist = previous
+            keep = old_pos >= 0
+            fresh = np.flatnonzero(~keep)
+            self.dist_matrix = np.empty((len(nodes), len(nodes)))
+            self.dist_matrix[np.ix_(keep, keep)] = old_dist[np.ix_(old_pos[keep], old_pos[keep])]
+            if len(fresh):
+                rows = haversine_matrix(nodes.lat[fresh], nodes.lon[fresh], nodes.lat, nodes.lon)
+                self.dist_matrix[fresh, :] = rows
+                self.dist_matrix[:, fresh] = rows.T
+                self.cost_evaluations['matrix'] += 2 * rows.size
+        self.build_land_distances()
+        self.apply_cost_multipliers()
+
+    def build_land_distances(self):
+        """
+        Jarak untuk leg darat (intra-stage). Tanpa matriks jalan = dist_matrix (haversine).
+        Dengan matriks jalan: hanya blok per stage yang dibaca dari memmap, pasangan NaN /
+        id yang tidak ada tetap memakai haversine. Leg udara selalu haversine (garis lurus).
+        """
+        if self.road_matrix is None:
+            self.land_dist_matrix = self.dist_matrix
+            self.road_stats = None
+            return
+        self.land_dist_matrix = self.dist_matrix.copy()
+        pairs = from_road = 0
+        for s in np.unique(self.nodes.stages):
+            positions = np.flatnonzero(self.nodes.stages == s)
+            ids = self.nodes.ids[positions].tolist()
+            block = self.road_matrix.block(ids, ids)
+            found = np.isfinite(block)
+            sub = self.land_dist_matrix[np.ix_(positions, positions)]
+            self.land_dist_matrix[np.ix_(positions, positions)] = np.where(found, block, sub)
+            pairs += block.size
+            from_road += int(found.sum())
+        self.road_stats = {'pairs': pairs, 'road': from_road, 'fallback': pairs - from_road}
+
+    def apply_cost_multipliers(self):
+        # Matriks biaya dari dist_matrix + multiplier saat ini (tanpa menghitung haversine ulang)
+        nodes = self.nodes
+        stage = nodes.stages
+        # Biaya Darat (Intra-Stage)
+        self.land_cost_matrix = self.land_dist_matrix * self.cost_multipliers.get('land', 5000)
+        # Biaya Udara (Inter-Stage) + landing fee jika tujuan ada di Zona Merah (Stage 1)
+        self.landing_fee = np.where(stage == 1, nodes.base_fee, 0.0)
+        self.air_cost_matrix = self.dist_matrix * self.cost_multipliers.get('air', 50000) + self.landing_fee[None, :]
+
+        same_stage = stage[:, None] == stage[None, :]
+        self.cost_matrix = np.where(same_stage, self.land_cost_matrix, self.air_cost_matrix)
+        self.stage_positions = {s: np.flatnonzero(stage == s) for s in np.unique(stage)}
+
+    def with_cost_multipliers(self, cost_multipliers):
+        """
+        Instance baru dengan multiplier lain yang berbagi NodeStore dan dist_matrix (warm start):
+        hanya matriks biaya yang dibangun ulang, state solve / trace / profiler masih kosong.
+        """
+        clone = copy.copy(self)
+        clone.cost_multipliers = dict(cost_multipliers)
+        clone.stage_stats, clone.stage_tours, clone.dp_table, clone.cost_to_finish, clone.kbest = {}, {}, {}, {}, {}
+        clone.cost_evaluations = dict.fromkeys(self.cost_evaluations, 0)
+        clone.trace = TraceLog(self.trace.level, self.trace.capacity)
+        clone.profiler = SolveProfiler() if self.profiler.enabled else NULL_PROFILER
+        if isinstance(self.nodes, CountingNodeStore):
+            # Geometri tetap dibagi, tetapi lookup clone masuk ke profiler clone
+            clone.nodes = copy.copy(self.nodes)
+            clone.nodes.profiler = clone.profiler
+        clone.profile_report = None
+        clone.apply_cost_multipliers()
+        return clone
+
+    def with_scenario(self, cost_multipliers, fee_scale=None, closed_nodes=None, closed_edges=None):
+        """
+        Clone (seperti with_cost_multipliers) dengan gangguan skenario di atas matriks biaya:
+          fee_scale: faktor landing fee per node (sejajar NodeStore)
+          closed_nodes: posisi node yang tidak bisa dijangkau -> dikeluarkan dari stage-nya
+          closed_edges: (posisi_asal, posisi_tujuan) -> biaya leg tersebut menjadi inf
+        Geometri (NodeStore, dist_matrix, land_dist_matrix) tetap dibagi dengan instance ini.
+        """
+        clone = self.with_cost_multipliers(cost_multipliers)
+        if fee_scale is not None:
+            clone.landing_fee = self.landing_fee * fee_scale
+            clone.air_cost_matrix = clone.air_cost_matrix + (clone.landing_fee - self.landing_fee)[None, :]
+            same_stage = self.nodes.stages[:, None] == self.nodes.stages[None, :]
+            clone.cost_matrix = np.where(same_stage, clone.land_cost_matrix, clone.air_cost_matrix)
+        if closed_edges is not None and len(closed_edges[0]):
+            if fee_scale is None:
+                clone.cost_matrix = clone.cost_matrix.copy()
+            clone.cost_matrix[closed_edges] = np.inf
+        if closed_nodes is not None and len(closed_nodes):
+            closed = np.zeros(len(self.nodes), dtype=bool)
+            closed[closed_nodes] = True
+            clone.stage_positions = {s: pos[~closed[pos]] for s, pos in clone.stage_positions.items()}
+        return clone
+
+    def stage_node_ids(self, stage_id):
+        return [self.nodes.id_at(p) for p in self.stage_positions.get(stage_id, [])]
+
+    def next_stage(self, stage):
+        # Stage berikutnya menurut urutan self.stages (tidak harus stage + 1, mis. 1, 2, 4)
+        successors = dict(zip(self.stages[:-1], self.stages[1:]))
+        return successors.get(stage)
+
+    def start_position(self):
+        # Assuming ID 0 is Jakarta/Start, fallback ke 'START', lalu node pertama di Stage 0
+        for start_id in (0, 'START'):
+            if start_id in self.nodes:
+                return self.nodes.pos(start_id)
+        return int(self.stage_positions[0][0])
+
+    def get_distance(self, node_a, node_b):
+        # Jarak yang benar-benar ditempuh: jalan (jika ada) untuk leg darat, garis lurus untuk udara
+        same_stage = node_a['stage_prioritas'] == node_b['stage_prioritas']
+        pos_a = self.nodes.index.get(node_a['id'])
+        pos_b = self.nodes.index.get(node_b['id'])
+        if pos_a is not None and pos_b is not None:
+            return (self.land_dist_matrix if same_stage else self.dist_matrix)[pos_a, pos_b]
+        if same_stage and self.road_matrix is not None:
+            road_km = self.road_matrix.get(node_a['id'], node_b['id'])
+            if road_km is not None:
+                return road_km
+        return self.calculate_haversine(node_a['lat'], node_a['lon'], node_b['lat'], node_b['lon'])
 
     def calculate_haversine(self, lat1, lon1, lat2, lon2):
         R = 6371
@@ -22,7 +653,13 @@ class LogisticsSolver:
         return R * c
 
     def get_transport_cost(self, node_a, node_b):
-        dist = self.calculate_haversine(node_a['lat'], node_a['lon'], node_b['lat'], node_b['lon'])
+        # Jalur cepat: kedua node ada di dataset -> baca dari matriks biaya
+        pos_a = self.nodes.index.get(node_a['id'])
+        pos_b = self.nodes.index.get(node_b['id'])
+        if pos_a is not None and pos_b is not None:
+            return self.cost_matrix[pos_a, pos_b]
+
+        dist = self.get_distance(node_a, node_b)
         
         # Logika Biaya:
         # 1. Intra-Stage (Skeliling Satu Wilayah) -> Darat (Murah)
@@ -46,171 +683,711 @@ class LogisticsSolver:
             return base_cost + variable_cost
 
     def solve_open_tsp_dynamic(self, stage_id, entry_node_id):
-        stage_nodes = self.df[self.df['stage_prioritas'] == stage_id].copy()
+        stage_pos = self.stage_positions.get(stage_id, np.array([], dtype=int))
+        entry_pos = self.nodes.pos(entry_node_id)
         # Visit all OTHER nodes in this stage
-        to_visit_ids = [nid for nid in stage_nodes['id'].tolist() if nid != entry_node_id]
+        to_visit = [p for p in stage_pos.tolist() if p != entry_pos]
         
-        if not to_visit_ids:
+        if not to_visit:
             return 0, [entry_node_id], entry_node_id
             
-        current_id = entry_node_id
+        current = entry_pos
         path = [entry_node_id]
         total_dist_cost = 0
         
-        while to_visit_ids:
-            curr_node = self.df[self.df['id'] == current_id].iloc[0]
-            best_next_id = None
-            min_step_cost = float('inf')
+        while to_visit:
+            # Simple Greedy Nearest Neighbor (satu baris matriks, bukan loop per kandidat)
+            step_costs = self.cost_matrix[current, to_visit]
+            k = int(np.argmin(step_costs))
+            best_next = to_visit.pop(k)
             
-            # Simple Greedy Nearest Neighbor
-            for cand_id in to_visit_ids:
-                cand_node = self.df[self.df['id'] == cand_id].iloc[0]
-                cost = self.get_transport_cost(curr_node, cand_node)
-                if cost < min_step_cost:
-                    min_step_cost = cost
-                    best_next_id = cand_id
+            total_dist_cost += step_costs[k]
+            path.append(self.nodes.id_at(best_next))
+            current = best_next
             
-            total_dist_cost += min_step_cost
-            path.append(best_next_id)
-            to_visit_ids.remove(best_next_id)
-            current_id = best_next_id
+        return total_dist_cost, path, path[-1]
+
+    def stage_cost(self, stage_id):
+        positions = self.stage_positions[stage_id]
+        return positions, self.cost_matrix[np.ix_(positions, positions)]
+
+    def use_exact(self, m):
+        return m <= self.exact_max_nodes and held_karp_memory_bytes(m) <= self.exact_memory_limit
+
+    def solve_open_tsp_exact(self, stage_id):
+        positions, sub_cost = self.stage_cost(stage_id)
+        return exact_stage_tours(stage_id, positions, sub_cost)
+
+    def stage_coords(self, stage_id):
+        # Koordinat untuk spatial index, hanya untuk stage besar
+        positions = self.stage_positions[stage_id]
+        # Spatial index berbasis geometri: tidak valid jika biaya darat memakai jarak jalan
+        if len(positions) < self.spatial_index_min_nodes or self.road_matrix is not None:
+            return None
+        return self.nodes.lat[positions], self.nodes.lon[positions]
+
+    def solve_open_tsp_heuristic(self, stage_id):
+        positions, sub_cost = self.stage_cost(stage_id)
+        return heuristic_stage_tours(stage_id, positions, sub_cost, self.local_search_budget, self.local_search_neighbours,
+                                     coords=self.stage_coords(stage_id), time_cap=self.local_search_time_cap)
+
+    def solve_stage_tours(self, stage_id):
+        # Pilih otomatis: eksak untuk stage kecil, fallback heuristik jika terlalu besar
+        if self.use_exact(len(self.stage_positions[stage_id])):
+            tours = self.solve_open_tsp_exact(stage_id)
+        else:
+            tours = self.solve_open_tsp_heuristic(stage_id)
+        self.record_stage_stats(tours)
+        return tours
+
+    def record_stage_stats(self, tours, **extra):
+        self.cost_evaluations['stage_tours'] += tours.evaluations
+        self.profiler.count('tsp_calls')
+        self.stage_stats[tours.stage] = {
+            'stage': int(tours.stage),
+            'nodes': len(tours.positions),
+            'method': tours.method,
+            'runtime_s': tours.runtime_s,
+            'memory_bytes': tours.memory_bytes,
+            'local_search_saving': float(tours.savings.sum()),
+            **extra
+        }
+
+    def solve_all_stage_tours(self, stages=None):
+        # Tur lokal tiap stage tidak bergantung pada biaya DP -> bisa dihitung dulu (serial / paralel)
+        stages = self.stages if stages is None else stages
+        if self.workers and self.workers > 1 and stages:
+            from parallel import solve_stage_tours_parallel
+            return solve_stage_tours_parallel(self, stages)
+        return {stage: self.solve_stage_tours(stage) for stage in stages}
+
+    def sweep_multipliers(self, land_values, air_values, max_elements=20_000_000):
+        """
+        Evaluasi seluruh grid (land, air) dalam satu pass backward ter-batch.
+        Biaya edge linear terhadap multiplier: Lokal = land * km, Transisi = air * km + landing fee.
+        Tur lokal tidak berubah oleh skala land, jadi cukup dihitung sekali (stage_tours).
+        """
+        land_values = np.asarray(land_values, dtype=float)
+        air_values = np.asarray(air_values, dtype=float)
+        base_land = self.cost_multipliers.get('land', 5000)
+        if base_land <= 0:
+            raise ValueError("Sweep membutuhkan multiplier land solver > 0")
+        if not self.stage_tours:
+            self.stage_tours = self.solve_all_stage_tours()
+
+        land_grid, air_grid = np.meshgrid(land_values, air_values, indexing='ij')
+        land_flat, air_flat = land_grid.ravel(), air_grid.ravel()
+        # Batasi memori (P x M x M) dengan memproses grid per potongan
+        widest = max(len(t.positions) for t in self.stage_tours.values()) ** 2
+        chunk = max(1, max_elements // widest)
+
+        costs = np.empty(len(land_flat))
+        keys = []
+        for lo in range(0, len(land_flat), chunk):
+            chunk_cost, chunk_keys = self._sweep_chunk(land_flat[lo:lo + chunk], air_flat[lo:lo + chunk], base_land)
+            costs[lo:lo + chunk] = chunk_cost
+            keys.extend(chunk_keys)
+
+        route_index = {}
+        route_ids = np.array([route_index.setdefault(key, len(route_index)) for key in keys])
+        start_pos = self.start_position()
+        routes = []
+        for key in route_index:
+            path_pos = [start_pos]
+            for stage, (entry, exit_) in zip(self.stages, key):
+                path_pos.extend(self.stage_tours[stage].path_positions(entry, exit_))
+            routes.append([self.nodes.id_at(p) for p in path_pos])
+        return SweepResult(land_values, air_values, costs.reshape(land_grid.shape),
+                           route_ids.reshape(land_grid.shape), routes)
+
+    def _sweep_chunk(self, land, air, base_land):
+        pointers = {}
+        last_stage = self.stages[-1]
+        tours = self.stage_tours[last_stage]
+        local_km = tours.cost / base_land
+        last_exit = local_km.argmin(axis=1)
+        future = land[:, None] * local_km[np.arange(len(local_km)), last_exit][None, :]
+        pointers[last_stage] = (np.broadcast_to(last_exit, future.shape), None)
+
+        for stage in reversed(self.stages[:-1]):
+            tours = self.stage_tours[stage]
+            next_positions = self.stage_tours[self.next_stage(stage)].positions
+            local_km = tours.cost / base_land
+            transit_km = self.dist_matrix[np.ix_(tours.positions, next_positions)]
+            fee = self.landing_fee[next_positions]
+            # (min,+) ter-batch untuk semua titik grid: [P, exit, next] lalu [P, entry, exit]
+            via_exit = air[:, None, None] * transit_km[None] + fee[None, None, :] + future[:, None, :]
+            exit_next = via_exit.argmin(axis=2)
+            exit_best = np.take_along_axis(via_exit, exit_next[..., None], axis=2)[..., 0]
+            local = np.where(np.isfinite(local_km)[None], land[:, None, None] * np.nan_to_num(local_km, posinf=0.0)[None], np.inf)
+            total = local + exit_best[:, None, :]
+            best_exit = total.argmin(axis=2)
+            future = np.take_along_axis(total, best_exit[..., None], axis=2)[..., 0]
+            pointers[stage] = (best_exit, np.take_along_axis(exit_next, best_exit, axis=1))
+
+        start_pos = self.start_position()
+        first_positions = self.stage_tours[self.stages[0]].positions
+        initial = air[:, None] * self.dist_matrix[start_pos, first_positions][None, :] + self.landing_fee[first_positions][None, :]
+        totals = initial + future
+        best_entry = totals.argmin(axis=1)
+
+        keys = []
+        for p, entry in enumerate(best_entry.tolist()):
+            key = []
+            for stage in self.stages:
+                exits, nexts = pointers[stage]
+                exit_ = int(exits[p, entry])
+                key.append((entry, exit_))
+                if nexts is not None:
+                    entry = int(nexts[p, entry])
+            keys.append(tuple(key))
+        return totals[np.arange(len(totals)), best_entry], keys
+
+    def reconstruct_path(self, stage, entry):
+        # Ikuti back-pointer (next_entry + handle tur lokal) dari stage ini sampai finish
+        path_pos = []
+        while entry is not None:
+            state = self.dp_table[stage][entry]
+            path_pos.extend(self.stage_tours[stage].path_positions(*state['local_path']))
+            entry, stage = state['next_entry'], self.next_stage(stage)
+        return path_pos
+
+    def leg_breakdown(self, path_ids):
+        """
+        Rincian per leg (kolom sejajar) untuk satu rute, langsung dari matriks yang sudah ada:
+        from_id, to_id, from_name, to_name, mode ('land' / 'air'), distance_km,
+        variable_cost (km x multiplier), base_fee (landing fee), cost, cumulative_cost.
+        """
+        return self._leg_columns(np.array([self.nodes.pos(nid) for nid in path_ids], dtype=np.int64))
+
+    def _leg_columns(self, path_pos):
+        pos = np.asarray(path_pos, dtype=np.int64)
+        src, dst = pos[:-1], pos[1:]
+        same_stage = self.nodes.stages[src] == self.nodes.stages[dst]
+        cost = self.cost_matrix[src, dst]
+        base_fee = np.where(same_stage, 0.0, self.landing_fee[dst])
+        return {
+            'from_id': self.nodes.ids[src].tolist(),
+            'to_id': self.nodes.ids[dst].tolist(),
+            'from_name': self.nodes.names[src].tolist(),
+            'to_name': self.nodes.names[dst].tolist(),
+            'mode': np.where(same_stage, 'land', 'air').tolist(),
+            'distance_km': np.where(same_stage, self.land_dist_matrix[src, dst], self.dist_matrix[src, dst]).tolist(),
+            'variable_cost': (cost - base_fee).tolist(),
+            'base_fee': base_fee.tolist(),
+            'cost': cost.tolist(),
+            'cumulative_cost': np.cumsum(cost).tolist(),
+        }
+
+    def route_savings(self, stage, entry, dp=None):
+        dp = self.dp_table if dp is None else dp
+        stage_savings = {}
+        while entry is not None:
+            stage_savings[int(stage)] = float(dp[stage][entry].get('local_saving', 0.0))
+            entry, stage = dp[stage][entry]['next_entry'], self.next_stage(stage)
+        return stage_savings
+
+    def evaluate_depots(self, depots=None, top_k=None):
+        """
+        Bandingkan banyak depot awal dengan SATU tabel DP: biaya depot -> setiap entry stage pertama
+        (matriks depot x entry) ditambah cost_to_finish stage pertama, tanpa rekursi ulang.
+        depots: id node di dataset dan/atau dict {'id', 'nama_lokasi', 'lat', 'lon'} untuk depot
+        di luar dataset (biaya udara + landing fee). Default: semua node Stage 0.
+        Return: rute terbaik per depot, urut biaya total (top_k depot teratas, None = semua).
+        """
+        if not self.dp_table:
+            self.get_recommendations()
+        first_stage = self.stages[0]
+        first_positions = self.stage_tours[first_stage].positions
+        future = self.cost_to_finish[first_stage]
+        if depots is None:
+            depots = self.stage_node_ids(0)
+
+        records, depot_cost = [], np.empty((len(depots), len(first_positions)))
+        external = [i for i, d in enumerate(depots) if isinstance(d, dict)]
+        internal = [i for i, d in enumerate(depots) if not isinstance(d, dict)]
+        if internal:
+            positions = np.array([self.nodes.pos(depots[i]) for i in internal], dtype=np.int64)
+            depot_cost[internal] = self.cost_matrix[np.ix_(positions, first_positions)]
+        if external:
+            lat = np.array([float(depots[i]['lat']) for i in external])
+            lon = np.array([float(depots[i]['lon']) for i in external])
+            km = haversine_matrix(lat, lon, self.nodes.lat[first_positions], self.nodes.lon[first_positions])
+            depot_cost[external] = km * self.cost_multipliers.get('air', 50000) + self.landing_fee[first_positions][None, :]
+        for d in depots:
+            if isinstance(d, dict):
+                records.append(NodeRecord(d['id'], d.get('nama_lokasi', str(d['id'])), 0, d.get('provinsi', ''),
+                                          float(d['lat']), float(d['lon']), 0.0))
+            else:
+                records.append(self.nodes.get(d))
+        self.cost_evaluations['start'] += depot_cost.size
+
+        totals = depot_cost + future[None, :]
+        best_entry = totals.argmin(axis=1)
+        best_total = totals[np.arange(len(depots)), best_entry]
+        order = np.argsort(best_total, kind='stable')[:top_k]
+
+        results = []
+        for rank, d in enumerate(order.tolist(), start=1):
+            j = int(best_entry[d])
+            entry = self.nodes.id_at(first_positions[j])
+            path_pos = self.reconstruct_path(first_stage, entry)
+            results.append({
+                'rank': rank,
+                'depot': records[d]['id'],
+                'depot_name': records[d]['nama_lokasi'],
+                'entry': entry,
+                'initial_cost': float(depot_cost[d, j]),
+                'total_cost': float(best_total[d]),
+                'full_path': [records[d]] + [self.nodes.record(p) for p in path_pos],
+                'local_search_savings': self.route_savings(first_stage, entry),
+            })
+        return results
+
+    @property
+    def steps_log(self):
+        # Render lazy dari record numerik (format sama dengan log lama); mahal untuk run besar
+        return self.trace.render_all(self.nodes)
+
+    def trace_lookup(self, stage, node_id):
+        # Query ter-index (stage, node) -> log keputusan yang sudah dirender, atau None
+        pos = self.nodes.index.get(node_id)
+        rec = None if pos is None else self.trace.lookup(stage, pos)
+        return None if rec is None else self.trace.render(rec, self.nodes)
+
+    def summary(self, results):
+        # Ringkasan ringan hasil solve terakhir (lihat SolveSummary) untuk disimpan di ResultCache
+        return SolveSummary(self, results)
+
+    def dp_records(self):
+        # Tabel DP bertipe (DP_DTYPE), urut stage lalu entry; lihat dp_export untuk paging / ekspor
+        index = self.nodes.index
+        parts = []
+        for stage in sorted(self.dp_table):
+            states = self.dp_table[stage]
+            rec = np.empty(len(states), dtype=DP_DTYPE)
+            rec['stage'] = stage
+            rec['entry'] = [index[entry] for entry in states]
+            rec['exit'] = [index[state['exit']] for state in states.values()]
+            rec['next'] = [-1 if state['next_entry'] is None else index[state['next_entry']] for state in states.values()]
+            rec['cost_to_finish'] = [state['total_cost'] for state in states.values()]
+            rec['local_saving'] = [state.get('local_saving', 0.0) for state in states.values()]
+            parts.append(rec)
+        return np.concatenate(parts) if parts else np.empty(0, dtype=DP_DTYPE)
+
+    def _solve_base_stage(self, last_stage, dp):
+        dp[last_stage] = {}
+        tours = self.stage_tours[last_stage]
+        # Exit bebas: ambil tur lokal termurah dari setiap entry
+        last_exit = tours.cost.argmin(axis=1)
+        self.cost_evaluations['transition'] += tours.cost.size
+        self.cost_to_finish[last_stage] = tours.cost[np.arange(len(tours.cost)), last_exit]
+        for i, entry_pos in enumerate(tours.positions):
+            entry = self.nodes.id_at(entry_pos)
+            j = int(last_exit[i])
+            cost = self.cost_to_finish[last_stage][i]
+            # Back-pointer saja: path lokal direkonstruksi belakangan dari handle (i, j)
+            dp[last_stage][entry] = {'total_cost': cost, 'next_entry': None, 'exit': self.nodes.id_at(tours.positions[j]),
+                                     'local_path': (i, j), 'local_saving': tours.savings[i]}
+        
+        # LOG: Mencatat Base Case (satu batch numerik per stage)
+        finish = self.cost_to_finish[last_stage]
+        self.trace.append(KIND_BASE, last_stage, tours.positions, tours.positions[last_exit], -1, finish, 0.0, 0.0, finish)
+        self.profiler.count('dp_states', len(tours.positions))
+
+    def _solve_backward_stage(self, stage, next_stage, dp):
+        tours = self.stage_tours[stage]
+        # A + B. Lokal (entry -> exit) + Transisi (exit -> next entry) + Future, sekaligus untuk semua entry
+        next_positions = self.stage_tours[next_stage].positions
+        future = self.cost_to_finish[next_stage]
+        transit = self.cost_matrix[np.ix_(tours.positions, next_positions)]
+        best_total, best_exit, best_next = min_plus_transition(tours.cost, transit, future)
+        self.cost_evaluations['transition'] += tours.cost.size + transit.size
+        self.cost_to_finish[stage] = best_total
+        
+        for i, entry_pos in enumerate(tours.positions):
+            if not np.isfinite(best_total[i]):
+                continue
+            entry = self.nodes.id_at(entry_pos)
+            j, k = best_exit[i], best_next[i]
+            next_entry = self.nodes.id_at(next_positions[k])
             
-        return total_dist_cost, path, current_id
+            dp[stage][entry] = {
+                'total_cost': best_total[i],
+                'next_entry': next_entry,
+                'exit': self.nodes.id_at(tours.positions[j]),
+                'local_path': (i, int(j)),
+                'local_saving': tours.savings[i]
+            }
+        
+        # LOG: Mencatat Keputusan Rekursif (+ semua kandidat entry x exit pada level full)
+        if self.trace.full:
+            exit_next = (transit + future[None, :]).argmin(axis=1)
+            ii, xx = np.divmod(np.arange(tours.cost.size), len(tours.positions))
+            nn = exit_next[xx]
+            self.trace.append(KIND_CANDIDATE, stage, tours.positions[ii], tours.positions[xx], next_positions[nn],
+                              tours.cost[ii, xx], transit[xx, nn], future[nn], tours.cost[ii, xx] + transit[xx, nn] + future[nn])
+        ok = np.flatnonzero(np.isfinite(best_total))
+        j, k = best_exit[ok], best_next[ok]
+        self.trace.append(KIND_RECURSIVE, stage, tours.positions[ok], tours.positions[j], next_positions[k],
+                          tours.cost[ok, j], transit[j, k], future[k], best_total[ok])
+        self.profiler.count('dp_states', len(dp[stage]))
+
+    def _solve_kbest_stages(self, k, reuse_stages=()):
+        """
+        k-best DP mundur: untuk setiap state (stage, entry) simpan k solusi parsial termurah.
+        Dua tahap kbest_merge per stage: (1) per exit x: transit[x, n] + k-best next entry n,
+        (2) per entry e: lokal[e, x] + hasil (1). Back-pointer disimpan sebagai indeks lokal stage
+        (cost/exit/next/next_rank, masing-masing [m, k]) -> memori linear terhadap k.
+        Tabel stage yang dipakai ulang (reuse) tetap valid selama k-nya cukup.
+        """
+        dirty = False
+        for stage in reversed(self.stages):
+            cached = self.kbest.get(stage)
+            if not dirty and stage in reuse_stages and cached is not None and cached['k'] >= k:
+                continue
+            dirty = True
+            tours = self.stage_tours[stage]
+            m = len(tours.positions)
+            if stage == self.stages[-1]:
+                # Base case: k exit termurah per entry (exit bebas)
+                order = np.argsort(tours.cost, axis=1, kind='stable')[:, :k]
+                cost = np.full((m, k), np.inf)
+                cost[:, :order.shape[1]] = np.take_along_axis(tours.cost, order, axis=1)
+                exit_ = np.full((m, k), -1, dtype=np.int64)
+                exit_[:, :order.shape[1]] = order
+                exit_[~np.isfinite(cost)] = -1
+                self.kbest[stage] = {'k': k, 'cost': cost, 'exit': exit_,
+                                     'next': np.full((m, k), -1, dtype=np.int64), 'next_rank': np.full((m, k), -1, dtype=np.int64)}
+                self.cost_evaluations['transition'] += tours.cost.size
+                continue
+            next_stage = self.next_stage(stage)
+            following = self.kbest[next_stage]
+            transit = self.cost_matrix[np.ix_(tours.positions, self.stage_tours[next_stage].positions)]
+            via_cost, via_next, via_rank = kbest_merge(transit, following['cost'][:, :k], k)
+            cost, exit_, exit_rank = kbest_merge(tours.cost, via_cost, k)
+            valid = exit_ >= 0
+            safe_exit, safe_rank = np.where(valid, exit_, 0), np.where(valid, exit_rank, 0)
+            self.kbest[stage] = {
+                'k': k, 'cost': cost, 'exit': exit_,
+                'next': np.where(valid, via_next[safe_exit, safe_rank], -1),
+                'next_rank': np.where(valid, via_rank[safe_exit, safe_rank], -1),
+            }
+            self.cost_evaluations['transition'] += tours.cost.size + transit.size
+            self.profiler.count('dp_states', m * k)
+
+    def _kbest_recommendations(self, top_k, start_pos, reuse_stages=()):
+        first_stage = self.stages[0]
+        with self.profiler.phase('kbest'):
+            self._solve_kbest_stages(top_k, reuse_stages)
+            first_positions = self.stage_tours[first_stage].positions
+            initial = self.cost_matrix[start_pos, first_positions]
+            totals, entries, ranks = kbest_merge(initial[None, :], self.kbest[first_stage]['cost'][:, :top_k], top_k)
+            self.cost_evaluations['start'] += len(first_positions)
+
+        results = []
+        with self.profiler.phase('path_materialization'):
+            for total, entry, rank in zip(totals[0], entries[0].tolist(), ranks[0].tolist()):
+                if entry < 0:
+                    break
+                path_pos, savings = [start_pos], {}
+                stage = first_stage
+                while entry >= 0:
+                    # Ikuti back-pointer k-best: (entry, rank) -> (exit, next entry, rank berikutnya)
+                    table, tours = self.kbest[stage], self.stage_tours[stage]
+                    exit_ = int(table['exit'][entry, rank])
+                    path_pos.extend(tours.path_positions(entry, exit_))
+                    savings[int(stage)] = float(tours.savings[entry])
+                    entry, rank = int(table['next'][entry, rank]), int(table['next_rank'][entry, rank])
+                    stage = self.next_stage(stage)
+                results.append({
+                    'total_cost': float(total),
+                    'full_path': [self.nodes.record(p) for p in path_pos],
+                    'legs': self._leg_columns(path_pos),
+                    'local_search_savings': savings,
+                })
+        return results
 
     def get_recommendations(self, top_k=1):
-        self.steps_log = [] # Reset Log
+        t0 = time.perf_counter()
+        self.profiler.reset()
+        self._reset_solve_state()
+        results = self._solve(top_k)
+        self.last_solve_s = time.perf_counter() - t0
+        self.profile_report = self.profiler.report(self.cost_evaluations)
+        return results
+
+    def solve_iter(self, top_k=1, deadline_s=None):
+        """
+        Solve anytime (generator) untuk UI / skenario besar.
+        Tahap 'draft': tur greedy cepat semua stage (tanpa Held-Karp / local search) lalu rekursi
+        penuh -> rute valid pertama. Tahap 'refine': tur tiap stage (maju dari stage pertama)
+        diganti tur normal selama deadline belum lewat; rekursi diulang hanya untuk stage itu dan
+        sebelumnya. Budget local search dibatasi sisa waktu; draft selalu diselesaikan.
+        Tanpa deadline tidak ada draft: tur normal per stage lalu satu rekursi (phase 'solve').
+        Event dict: 'stage_tours', 'stage_done', 'result' (hasil sementara), lalu 'done'
+        (hasil akhir); semua berisi phase, elapsed_s dan progress (0..1).
+        """
+        t0 = time.perf_counter()
+        deadline = None if deadline_s is None else t0 + deadline_s
+        n_stages = max(len(self.stages), 1)
+        # Satu laporan profil untuk seluruh generator (draft + refine), bukan per rekursi
+        self.profiler.reset()
+        self._reset_solve_state()
+
+        def stamp(event, phase, progress):
+            return {**event, 'phase': phase, 'elapsed_s': time.perf_counter() - t0, 'progress': progress}
+
+        if deadline is None:
+            # Tidak ada batas waktu: draft greedy hanya kerja ganda, langsung tur normal + satu rekursi
+            for i, stage in enumerate(self.stages):
+                with self.profiler.phase('stage_tours'):
+                    self.stage_tours.update(self.solve_all_stage_tours([stage]))
+                yield stamp({'event': 'stage_tours', 'stage': int(stage), 'method': self.stage_tours[stage].method},
+                            'solve', 0.5 * (i + 1) / n_stages)
+            done = 0
+            for event in self._solve_steps(top_k):
+                done += event['event'] == 'stage_done'
+                results = event.get('results')
+                yield stamp(event, 'solve', 0.5 + 0.5 * done / n_stages if results is None else 1.0)
+            self.last_solve_s = time.perf_counter() - t0
+            self.profile_report = self.profiler.report(self.cost_evaluations)
+            yield stamp({'event': 'done', 'results': results, 'refined_stages': [int(s) for s in self.stages],
+                         'deadline_hit': False}, 'solve', 1.0)
+            return
+
+        for i, stage in enumerate(self.stages):
+            with self.profiler.phase('stage_tours'):
+                positions, sub_cost = self.stage_cost(stage)
+                tours = heuristic_stage_tours(stage, positions, sub_cost, 0, self.local_search_neighbours,
+                                              coords=self.stage_coords(stage))
+                self.record_stage_stats(tours)
+            self.stage_tours[stage] = tours
+            yield stamp({'event': 'stage_tours', 'stage': int(stage), 'method': tours.method}, 'draft', 0.25 * (i + 1) / n_stages)
+        done = 0
+        for event in self._solve_steps(top_k):
+            done += event['event'] == 'stage_done'
+            results = event.get('results')
+            yield stamp(event, 'draft', 0.5 if results is not None else 0.25 + 0.25 * done / n_stages)
+
+        refined, deadline_hit = [], False
+        budget, time_cap = self.local_search_budget, self.local_search_time_cap
+        try:
+            for i, stage in enumerate(self.stages):
+                remaining = None if deadline is None else deadline - time.perf_counter()
+                if remaining is not None and remaining <= 0:
+                    deadline_hit = True
+                    break
+                if remaining is not None:
+                    # Mode deadline: jatah move ikut menyusut, dan wall-clock jadi batas luar (serial)
+                    self.local_search_budget = min(budget, 0.5 * remaining / (len(self.stages) - i))
+                    self.local_search_time_cap = self.local_search_budget
+                with self.profiler.phase('stage_tours'):
+                    self.stage_tours.update(self.solve_all_stage_tours([stage]))
+                refined.append(int(stage))
+                yield stamp({'event': 'stage_tours', 'stage': int(stage), 'method': self.stage_tours[stage].method},
+                            'refine', 0.5 + 0.5 * i / n_stages)
+                # Stage setelahnya tidak berubah -> entri DP + trace-nya dipakai ulang
+                reuse = {s for s in self.stages if s > stage}
+                self.trace.retain(reuse)
+                for event in self._solve_steps(top_k, reuse):
+                    if event['event'] == 'result':
+                        results = event['results']
+                    yield stamp(event, 'refine', 0.5 + 0.5 * (i + (event['event'] == 'result')) / n_stages)
+        finally:
+            self.local_search_budget, self.local_search_time_cap = budget, time_cap
+
+        self.last_solve_s = time.perf_counter() - t0
+        self.profile_report = self.profiler.report(self.cost_evaluations)
+        yield stamp({'event': 'done', 'results': results, 'refined_stages': refined, 'deadline_hit': deadline_hit},
+                    'refine' if refined else 'draft', 1.0)
+
+    def _reset_solve_state(self):
+        self.trace.clear() # Reset Log
         self.dp_table = {} # Store DP table for visualization
-        dp = {}
+        self.stage_tours = {} # Tur lokal per stage, dirujuk oleh back-pointer 'local_path'
+        self.kbest = {} # Tabel k-best per stage (hanya jika top_k > 1)
+        self.cost_to_finish = {} # Vektor biaya ke finish per stage (sejajar dengan stage_tours[stage].positions)
+        self.stage_stats = {}
+        self.cost_evaluations.update({'stage_tours': 0, 'transition': 0, 'start': 0})
+
+    def _solve(self, top_k, reuse_stages=()):
+        for event in self._solve_steps(top_k, reuse_stages):
+            pass
+        return event['results']
+
+    def _solve_steps(self, top_k, reuse_stages=()):
+        # Generator langkah solve: event 'stage_done' per stage DP, lalu satu event 'result'
+        # reuse_stages: stage yang entri DP + tur lokalnya masih valid (hanya stage SETELAH perubahan)
+        profiler = self.profiler
+        dp = {stage: self.dp_table[stage] for stage in reuse_stages}
         
         if not self.stages:
-             return []
+            yield {'event': 'result', 'results': []}
+            return
+
+        # --- LANGKAH 0: TUR LOKAL SEMUA STAGE (independen dari DP) ---
+        missing = [stage for stage in self.stages if stage not in self.stage_tours]
+        if missing:
+            with profiler.phase('stage_tours'):
+                self.stage_tours.update(self.solve_all_stage_tours(missing))
 
         # --- LANGKAH 1: STAGE TERAKHIR (Base Case) ---
         last_stage = self.stages[-1]
-        dp[last_stage] = {}
-        
-        last_nodes = self.df[self.df['stage_prioritas'] == last_stage]['id'].tolist()
-        for entry in last_nodes:
-            cost, path, exit_node = self.solve_open_tsp_dynamic(last_stage, entry)
-            dp[last_stage][entry] = {'total_cost': cost, 'full_path': path, 'next_entry': None}
-            
-            # LOG: Mencatat Base Case
-            entry_name = self.df[self.df['id'] == entry].iloc[0]['nama_lokasi']
-            self.steps_log.append({
-                "stage": int(last_stage),
-                "type": "Base Calculation",
-                "node": entry_name,
-                "detail": f"Menghitung biaya internal di Stage {last_stage}. Sisa biaya ke depan = 0.",
-                "math": f"Biaya Lokal ({cost:,.0f}) + Future (0) = {cost:,.0f}"
-            })
+        if last_stage not in reuse_stages:
+            with profiler.phase('base_case'):
+                self._solve_base_stage(last_stage, dp)
+        yield self._stage_event(last_stage, last_stage in reuse_stages)
 
         # --- LANGKAH 2: BACKWARD RECURSION ---
         # Traverse from second to last stage down to the first stage
-        for stage in reversed(self.stages[:-1]):
+        # Pasangan (stage, stage berikutnya) menurut urutan self.stages, jadi celah (1, 2, 4) tetap jalan
+        for stage, next_stage in reversed(list(zip(self.stages[:-1], self.stages[1:]))):
+            if stage in reuse_stages:
+                yield self._stage_event(stage, True)
+                continue
             dp[stage] = {}
-            curr_nodes = self.df[self.df['stage_prioritas'] == stage]['id'].tolist()
-            next_stage = stage + 1 # Assuming sequential stages
-            # If actual stages are not strictly sequential (e.g. 1, 3, 4), this logic needs 'next_stage_in_list'
-            # But sorted(unique) implies we treat them in order. 
-            # If next_stage is NOT in dp (gap in stages), we should look at available next stages.
-            # For this dataset, stages are 1, 2, 3, 4. So +1 works.
-            
-            for entry in curr_nodes:
-                entry_name = self.df[self.df['id'] == entry].iloc[0]['nama_lokasi']
-                
-                # A. Hitung TSP Lokal
-                local_cost, local_path, local_exit = self.solve_open_tsp_dynamic(stage, entry)
-                local_exit_node = self.df[self.df['id'] == local_exit].iloc[0]
-                
-                # B. Cari Sambungan Termurah
-                best_future_cost = float('inf')
-                best_connection = None
-                best_next_name = ""
-                transit_cost_saved = 0
-                future_cost_saved = 0
-                
-                if next_stage in dp:
-                    for next_entry, future_data in dp[next_stage].items():
-                        next_entry_node = self.df[self.df['id'] == next_entry].iloc[0]
-                        
-                        # Cost from Exit of this stage to Entry of Next Stage
-                        transit_cost = self.get_transport_cost(local_exit_node, next_entry_node)
-                        total = local_cost + transit_cost + future_data['total_cost']
-                        
-                        if total < best_future_cost:
-                            best_future_cost = total
-                            best_connection = {
-                                'total_cost': total,
-                                'full_path': local_path + future_data['full_path'],
-                                'next_entry': next_entry
-                            }
-                            # Simpan data untuk Log
-                            best_next_name = next_entry_node['nama_lokasi']
-                            transit_cost_saved = transit_cost
-                            future_cost_saved = future_data['total_cost']
-                
-                if best_connection:
-                    dp[stage][entry] = best_connection
-                    
-                    # LOG: Mencatat Keputusan Rekursif
-                    self.steps_log.append({
-                        "stage": int(stage),
-                        "type": "Recursive Decision",
-                        "node": entry_name,
-                        "detail": f"Dari {entry_name}, rute termurah adalah menuju **{best_next_name}** (Stage {next_stage}).",
-                        "math": f"Lokal ({local_cost:,.0f}) + Transisi ({transit_cost_saved:,.0f}) + Future ({future_cost_saved:,.0f}) = **{best_future_cost:,.0f}**"
-                    })
+            if next_stage not in dp:
+                continue
+            with profiler.phase(f"backward_stage_{stage}"):
+                self._solve_backward_stage(stage, next_stage, dp)
+            yield self._stage_event(stage, False)
 
         # --- LANGKAH 3: FINAL START (Stage 0 -> First Stage) ---
-        # Assuming ID 0 is Jakarta/Start
-        start_node_match = self.df[self.df['id'] == 0] 
-        if start_node_match.empty:
-             # Fallback if 0 not found, maybe 'START'?
-             start_node_match = self.df[self.df['id'] == 'START']
-        
-        if start_node_match.empty:
-             # Fallback: Just take the first node in Stage 0
-             start_node = self.df[self.df['stage_prioritas'] == 0].iloc[0]
-        else:
-             start_node = start_node_match.iloc[0]
+        start_pos = self.start_position()
 
         final_results = []
         first_stage = self.stages[0]
+        with profiler.phase('start_selection'):
+            self.cost_evaluations['start'] += len(dp[first_stage])
+            entry_positions, initial_costs = [], []
         
-        for entry, data in dp[first_stage].items():
-            entry_node = self.df[self.df['id'] == entry].iloc[0]
-            initial_cost = self.get_transport_cost(start_node, entry_node)
-            total_global = initial_cost + data['total_cost']
+            for entry, data in dp[first_stage].items():
+                entry_positions.append(self.nodes.pos(entry))
+                initial_cost = self.cost_matrix[start_pos, entry_positions[-1]]
+                initial_costs.append(initial_cost)
+                total_global = initial_cost + data['total_cost']
             
-            final_results.append({
-                'total_cost': total_global,
-                'full_path': [start_node['id']] + data['full_path']
-            })
+                final_results.append({
+                    'total_cost': total_global,
+                    'entry': entry,
+                    # Penghematan local search per stage di sepanjang rute ini
+                    'local_search_savings': self.route_savings(first_stage, entry, dp)
+                })
             
-            # LOG: Keputusan Akhir
-            self.steps_log.append({
-                "stage": 0,
-                "type": "Final Decision",
-                "node": f"{start_node['nama_lokasi']} (Start)",
-                "detail": f"Memilih masuk ke **{entry_node['nama_lokasi']}** sebagai pintu gerbang Stage {first_stage}.",
-                "math": f"Transport Awal ({initial_cost:,.0f}) + Sisa Rute ({data['total_cost']:,.0f}) = **{total_global:,.0f}**"
-            })
+            # LOG: Keputusan Akhir (Start -> setiap entry stage pertama)
+            if self.trace.enabled:
+                rest = np.array([data['total_cost'] for data in dp[first_stage].values()], dtype=float)
+                initial_costs = np.asarray(initial_costs, dtype=float)
+                self.trace.append(KIND_FINAL, 0, start_pos, -1, entry_positions, 0.0, initial_costs, rest, initial_costs + rest)
             
-        final_results.sort(key=lambda x: x['total_cost'])
+            final_results.sort(key=lambda x: x['total_cost'])
         
         self.dp_table = dp # Save for access
+
+        if top_k > 1:
+            # Top-k global sejati (bukan sekadar peringkat entry Stage 1)
+            yield {'event': 'result', 'results': self._kbest_recommendations(top_k, start_pos, reuse_stages)}
+            return
         
-        # Convert IDs to Node Dictionaries for app compatibility
-        for res in final_results[:top_k]:
-            path_ids = res['full_path']
-            # Create a lookup map for speed, though N is small
-            # res['full_path'] = [self.df[self.df['id'] == nid].iloc[0].to_dict() for nid in path_ids]
-            # optimization:
-            nodes_objs = []
-            for nid in path_ids:
-                row = self.df[self.df['id'] == nid]
-                if not row.empty:
-                    nodes_objs.append(row.iloc[0].to_dict())
-            res['full_path'] = nodes_objs
-            
-        return final_results[:top_k]
+        # Rekonstruksi path hanya untuk top-k yang dikembalikan (Node Records, tanpa copy to_dict())
+        with profiler.phase('path_materialization'):
+            for res in final_results[:top_k]:
+                path_pos = [start_pos] + self.reconstruct_path(first_stage, res.pop('entry'))
+                res['full_path'] = [self.nodes.record(p) for p in path_pos]
+                res['legs'] = self._leg_columns(path_pos)
+
+        yield {'event': 'result', 'results': final_results[:top_k]}
+
+    def _stage_event(self, stage, reused):
+        finish = self.cost_to_finish.get(stage)
+        best = float(finish.min()) if finish is not None and len(finish) else float('inf')
+        return {'event': 'stage_done', 'stage': int(stage), 'reused': reused, 'best_cost_to_finish': best}
+
+    def apply_updates(self, inserts=None, deletes=None, updates=None, top_k=1):
+        """
+        Terapkan delta node (insert / delete / update) lalu selesaikan ulang secara inkremental.
+        Karena rekursi berjalan mundur, hanya stage yang berubah dan stage SEBELUMNYA yang
+        dihitung ulang; entri DP dan tur lokal stage setelahnya dipakai ulang.
+          inserts: DataFrame / list of dict (kolom sama dengan data lokasi)
+          deletes: list id
+          updates: {id: {kolom: nilai_baru}}
+        Return: (hasil rekomendasi, laporan update).
+        """
+        t0 = time.perf_counter()
+        self.profiler.reset()
+        old_nodes, old_stages = self.nodes, self.stages
+        df = self.df.copy()
+        touched = set() # stage yang biayanya (lokal / transisi / fee) berubah
+        geometry = set() # stage yang tur lokalnya harus dihitung ulang
+        moved = set() # node dengan koordinat baru (baris jarak dihitung ulang)
+
+        for nid in deletes or []:
+            stage = old_nodes.stage(nid)
+            touched.add(stage)
+            geometry.add(stage)
+        df = df[~df['id'].isin(list(deletes or []))]
+
+        for nid, changes in (updates or {}).items():
+            old_stage = old_nodes.stage(nid)
+            new_stage = changes.get('stage_prioritas', old_stage)
+            touched.update({old_stage, new_stage})
+            if 'lat' in changes or 'lon' in changes:
+                moved.add(nid)
+            if nid in moved or new_stage != old_stage:
+                geometry.update({old_stage, new_stage})
+            mask = df['id'] == nid
+            for col, value in changes.items():
+                df.loc[mask, col] = value
+
+        if inserts is not None and len(inserts):
+            new_rows = pd.DataFrame(inserts)
+            touched.update(new_rows['stage_prioritas'].unique())
+            geometry.update(new_rows['stage_prioritas'].unique())
+            df = pd.concat([df, new_rows], ignore_index=True)
+        df = df.reset_index(drop=True)
+
+        # Bangun ulang index node + matriks (blok jarak node lama dipakai ulang)
+        self.df = df
+        self.stages = sorted(df['stage_prioritas'].unique())
+        if 0 in self.stages: self.stages.remove(0)
+        self.nodes = self._node_store(df)
+        old_pos = np.array([-1 if nid in moved else old_nodes.index.get(nid, -1) for nid in self.nodes.ids.tolist()], dtype=np.int64)
+        self.build_cost_matrices(previous=(old_pos, self.dist_matrix))
+
+        if self.stages != old_stages:
+            # Struktur stage berubah (stage baru / hilang): semua dihitung ulang
+            self.stage_tours, self.dp_table, self.kbest, reuse = {}, {}, {}, set()
+        else:
+            changed = [s for s in touched if s in self.stages]
+            reuse = {s for s in self.stages if not changed or s > max(changed)}
+            # Tabel k-best stage yang berubah juga basi, walau update ini sendiri hanya top_k=1
+            for stage in list(self.kbest):
+                if stage not in reuse:
+                    del self.kbest[stage]
+            for stage in list(self.stage_tours):
+                if stage in geometry:
+                    del self.stage_tours[stage]
+                else:
+                    # Komposisi stage sama, hanya posisi global yang bergeser
+                    self.stage_tours[stage].positions = self.stage_positions[stage]
+        recomputed = sorted(int(s) for s in self.stages if s not in self.stage_tours)
+        # Record trace stage yang dipakai ulang tetap disimpan, posisi node dipetakan ke NodeStore baru
+        remap = np.full(len(old_nodes), -1, dtype=np.int64)
+        for nid, pos in old_nodes.index.items():
+            remap[pos] = self.nodes.index.get(nid, -1)
+        self.trace.retain(reuse, remap)
+
+        results = self._solve(top_k, reuse_stages=reuse)
+        elapsed = time.perf_counter() - t0
+        self.profile_report = self.profiler.report(self.cost_evaluations)
+        full_s = getattr(self, 'last_solve_s', None)
+        self.last_update_report = {
+            'invalidated_stages': sorted(int(s) for s in self.stages if s not in reuse),
+            'reused_stages': sorted(int(s) for s in reuse),
+            'recomputed_tours': recomputed,
+            'update_s': elapsed,
+            'full_solve_s': full_s,
+            'speedup_vs_full': full_s / elapsed if full_s and elapsed > 0 else None,
+        }
+        return results, self.last_update_report
@@ -0,0 +1,81 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371
+
+def unit_sphere_xyz(lat, lon):
+    # Koordinat 3D di bola satuan: jarak chord monoton terhadap jarak great-circle (haversine)
+    phi = np.radians(np.asarray(lat, dtype=float))
+    lam = np.radians(np.asarray(lon, dtype=float))
+    return np.column_stack((np.cos(phi) * np.cos(lam), np.cos(phi) * np.sin(lam), np.sin(phi)))
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+class SpatialIndex:
+    """
+    Grid index (NumPy murni) di atas koordinat lat/lon untuk query k-tetangga terdekat.
+    Pencarian ring per ring: setelah ring r selesai, semua titik yang belum dilihat berjarak
+    chord > r * cell_size, sehingga hasil dijamin sama dengan scan menyeluruh.
+    """
+    def __init__(self, lat, lon, points_per_cell=4):
+        self.xyz = unit_sphere_xyz(lat, lon)
+        n = len(self.xyz)
+        lo = self.xyz.min(axis=0) if n else np.zeros(3)
+        extent = float((self.xyz.max(axis=0) - lo).max()) if n else 0.0
+        cells_per_axis = max(1, int(np.ceil(np.sqrt(n / points_per_cell))))
+        self.cell_size = extent / cells_per_axis if extent > 0 else 1.0
+        cell_of = np.floor((self.xyz - lo) / self.cell_size).astype(np.int64)
+        self.cells, self.point_cell = np.unique(cell_of, axis=0, return_inverse=True)
+        self.point_cell = self.point_cell.ravel()
+        order = np.argsort(self.point_cell, kind='stable')
+        bounds = np.searchsorted(self.point_cell[order], np.arange(len(self.cells) + 1))
+        self.members = [order[bounds[c]:bounds[c + 1]] for c in range(len(self.cells))]
+        self.distance_evaluations = 0
+
+    def __len__(self):
+        return len(self.xyz)
+
+    def knn(self, i, k=1, alive=None, cell_ids=None):
+        """
+        k titik terdekat dari titik i (tidak termasuk i). alive: mask titik yang masih boleh dipilih.
+        cell_ids: subset cell yang masih berisi titik alive (optimasi internal).
+        Return: (indeks[<=k], jarak_km[<=k]) terurut dari yang terdekat; lebih sedikit dari k
+        jika kandidat yang tersisa memang kurang.
+        """
+        cell_ids = np.arange(len(self.cells)) if cell_ids is None else cell_ids
+        if len(cell_ids) == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        cheb = np.abs(self.cells[cell_ids] - self.cells[self.point_cell[i]]).max(axis=1)
+        found_idx, found_d = [], []
+        n_found = 0
+        max_r = int(cheb.max())
+        for r in range(max_r + 1):
+            ring = cell_ids[cheb == r]
+            if len(ring):
+                pts = np.concatenate([self.members[c] for c in ring])
+                if alive is not None:
+                    pts = pts[alive[pts]]
+                pts = pts[pts != i]
+                if len(pts):
+                    found_idx.append(pts)
+                    found_d.append(np.linalg.norm(self.xyz[pts] - self.xyz[i], axis=1))
+                    self.distance_evaluations += len(pts)
+                    n_found += len(pts)
+            if n_found >= k:
+                d = np.concatenate(found_d)
+                if np.partition(d, k - 1)[k - 1] <= r * self.cell_size:
+                    break
+        if not n_found:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        idx = np.concatenate(found_idx)
+        d = np.concatenate(found_d)
+        order = np.lexsort((idx, d))[:k] # tie-break: indeks terkecil (sama dengan argmin scan)
+        return idx[order], chord_to_km(d[order])
+
+    def neighbour_lists(self, k=8):
+        # Pengganti argpartition pada matriks m x m untuk stage besar
+        k = min(k, len(self) - 1)
+        nbrs = np.empty((len(self), max(k, 0)), dtype=np.int64)
+        for i in range(len(self)):
+            nbrs[i] = self.knn(i, k)[0]
+        return nbrs
@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import solver
+from scenario_generator import generate_scenario
+
+def full_solve(df, top_k):
+    return solver.LogisticsSolver(df, local_search_budget=0).get_recommendations(top_k=top_k)
+
+def assert_same_results(results, expected):
+    assert [r['total_cost'] for r in results] == pytest.approx([r['total_cost'] for r in expected])
+    assert [[n['id'] for n in r['full_path']] for r in results] == [[n['id'] for n in r['full_path']] for r in expected]
+
+@pytest.mark.parametrize('top_k', [1, 3])
+def test_incremental_updates_match_full_solve(top_k):
+    df = generate_scenario(n_stages=4, nodes_per_stage=7, seed=3)
+    instance = solver.LogisticsSolver(df, local_search_budget=0)
+    instance.get_recommendations(top_k=top_k)
+    by_stage = {s: df.loc[df['stage_prioritas'] == s, 'id'].tolist() for s in range(1, 5)}
+    template = df.loc[df['id'] == by_stage[2][0]].iloc[0]
+
+    deltas = [
+        {'updates': {by_stage[4][1]: {'biaya_basis_idr': 5_000_000}}},
+        {'updates': {by_stage[3][0]: {'lat': template['lat'] + 0.4, 'lon': template['lon']}}},
+        {'deletes': [by_stage[2][2]]},
+        {'inserts': pd.DataFrame([{**template.to_dict(), 'id': 10_000, 'nama_lokasi': 'Posko Baru',
+                                   'lat': template['lat'] - 0.25}])},
+        {'updates': {by_stage[1][1]: {'biaya_basis_idr': 1_000_000}}},
+        {'updates': {by_stage[1][0]: {'stage_prioritas': 2}}},
+    ]
+    reused = []
+    for delta in deltas:
+        results, report = instance.apply_updates(top_k=top_k, **delta)
+        reused.append(report['reused_stages'])
+        assert_same_results(results, full_solve(instance.df, top_k))
+        assert np.isclose(results[0]['total_cost'], np.sum(results[0]['legs']['cost']))
+    assert any(reused) # jalur inkremental benar-benar memakai ulang stage
@@ -0,0 +1,55 @@
+import itertools
+
+import numpy as np
+import pytest
+
+import solver
+from scenario_generator import generate_scenario
+
+def brute_force_totals(instance):
+    # Semua kombinasi (entry, exit) per stage, biaya lokal dari tur stage yang sama dengan solver
+    start = instance.start_position()
+    stages = [instance.stage_tours[s] for s in instance.stages]
+    pairs = [list(zip(*np.nonzero(np.isfinite(t.cost)))) for t in stages]
+    totals = []
+    for combo in itertools.product(*pairs):
+        total, prev = 0.0, start
+        for tours, (i, j) in zip(stages, combo):
+            total += instance.cost_matrix[prev, tours.positions[i]] + tours.cost[i, j]
+            prev = tours.positions[j]
+        totals.append(total)
+    return np.sort(totals)
+
+def test_kbest_matches_brute_force():
+    instance = solver.LogisticsSolver(generate_scenario(n_stages=3, nodes_per_stage=4, seed=1), local_search_budget=0)
+    results = instance.get_recommendations(top_k=6)
+    expected = brute_force_totals(instance)[:6]
+    assert np.allclose([r['total_cost'] for r in results], expected)
+    for result in results:
+        assert np.isclose(result['total_cost'], np.sum(result['legs']['cost']))
+
+def test_kbest_after_mixed_top_k_updates_matches_full_solve():
+    df = generate_scenario(n_stages=4, nodes_per_stage=6, seed=2)
+    instance = solver.LogisticsSolver(df, local_search_budget=0)
+    instance.get_recommendations(top_k=3)
+    stage3 = int(df.loc[df['stage_prioritas'] == 3, 'id'].iloc[0])
+    row = df.loc[df['id'] == stage3].iloc[0]
+    instance.apply_updates(updates={stage3: {'lat': row['lat'] + 0.3, 'lon': row['lon'] - 0.2}}, top_k=1)
+    stage1 = int(df.loc[df['stage_prioritas'] == 1, 'id'].iloc[0])
+    results, _ = instance.apply_updates(updates={stage1: {'biaya_basis_idr': 1_000_000}}, top_k=3)
+
+    full = solver.LogisticsSolver(instance.df, local_search_budget=0).get_recommendations(top_k=3)
+    assert np.allclose([r['total_cost'] for r in results], [r['total_cost'] for r in full])
+    for result in results:
+        assert np.isclose(result['total_cost'], np.sum(result['legs']['cost']))
+
+@pytest.mark.parametrize('top_k', [1, 3])
+def test_non_contiguous_stages_follow_stage_order(top_k):
+    # Stage 3 dihapus: urutan jadi 1 -> 2 -> 4, bukan stage + 1
+    df = generate_scenario(n_stages=4, nodes_per_stage=4, seed=4)
+    instance = solver.LogisticsSolver(df[df['stage_prioritas'] != 3], local_search_budget=0)
+    results = instance.get_recommendations(top_k=top_k)
+    assert np.allclose([r['total_cost'] for r in results], brute_force_totals(instance)[:top_k])
+    assert list(results[0]['local_search_savings']) == [1, 2, 4]
+    sweep = instance.sweep_multipliers([instance.cost_multipliers['land']], [instance.cost_multipliers['air']])
+    assert np.isclose(sweep.costs.min(), results[0]['total_cost'])
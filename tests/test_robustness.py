@@ -0,0 +1,32 @@
+import numpy as np
+
+import solver
+from robustness import run_robustness
+from scenario_generator import generate_scenario
+
+def test_greedy_dead_end_keeps_valid_permutation():
+    rng = np.random.default_rng(0)
+    cost = rng.uniform(1, 10, (6, 6))
+    cost[3, :] = np.inf # semua leg keluar dari node 3 tertutup
+    totals, paths, exits, _ = solver.batched_greedy_open_paths(cost)
+    for total, path in zip(totals, paths):
+        assert sorted(path.tolist()) == list(range(6))
+        assert np.isfinite(total) == (path[-1] == 3)
+    assert np.array_equal(exits, paths[:, -1])
+
+def test_robustness_with_closed_edges_on_large_stage():
+    # Stage 60 node: greedy heuristik + local search di bawah edge tertutup (inf)
+    base = solver.LogisticsSolver(generate_scenario(n_stages=3, nodes_per_stage=[4, 60, 4]), local_search_budget=0.05)
+    report = run_robustness(base, 40, seed=0, workers=1, local_search_budget=0.05)
+    assert len(report.optimal_cost) == 40
+    assert report.feasible.any()
+    assert (report.route_ids[report.feasible] >= 0).all()
+    for route in report.routes:
+        assert len(set(route)) == len(route) # tidak ada node ganda dari argmin yang jatuh ke node terkunjungi
+
+def test_robustness_is_reproducible_from_seed():
+    base = solver.LogisticsSolver(generate_scenario(n_stages=3, nodes_per_stage=[4, 40, 4]), local_search_budget=0.05)
+    first = run_robustness(base, 12, seed=3, workers=1, local_search_budget=0.05)
+    second = run_robustness(base, 12, seed=3, workers=2, local_search_budget=0.05)
+    assert np.array_equal(first.optimal_cost, second.optimal_cost)
+    assert first.routes == second.routes
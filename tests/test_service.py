@@ -0,0 +1,16 @@
+import asyncio
+
+import pytest
+
+import service
+
+@pytest.mark.parametrize('params', [
+    {'land': 'nan'}, {'air': 'inf'}, {'land': -5000}, {'air': 0}, {'top_k': 0}, {'top_k': service.MAX_TOP_K + 1},
+])
+def test_solve_rejects_invalid_parameters(params):
+    instance = service.SolveService({'default': 'data_lokasi_bencana.csv'}, workers=1)
+    try:
+        with pytest.raises(service.BadRequest):
+            asyncio.run(instance.solve(params))
+    finally:
+        instance.close()
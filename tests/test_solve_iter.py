@@ -0,0 +1,40 @@
+import solver
+from scenario_generator import generate_scenario
+
+def test_solve_iter_without_deadline_skips_draft():
+    df = generate_scenario(n_stages=3, nodes_per_stage=30, seed=6)
+    expected = solver.LogisticsSolver(df, local_search_budget=0).get_recommendations(top_k=3)
+    events = list(solver.LogisticsSolver(df, local_search_budget=0).solve_iter(top_k=3))
+    assert {event['phase'] for event in events} == {'solve'}
+    assert sum(event['event'] == 'stage_tours' for event in events) == 3 # satu konstruksi tur per stage
+    assert [r['total_cost'] for r in events[-1]['results']] == [r['total_cost'] for r in expected]
+
+def test_solve_iter_with_deadline_starts_from_draft():
+    df = generate_scenario(n_stages=3, nodes_per_stage=30, seed=6)
+    events = list(solver.LogisticsSolver(df, local_search_budget=0).solve_iter(top_k=1, deadline_s=60))
+    assert events[0]['phase'] == 'draft'
+    assert events[-1]['event'] == 'done' and not events[-1]['deadline_hit']
+
+def test_solve_iter_profile_covers_stage_tours():
+    df = generate_scenario(n_stages=3, nodes_per_stage=30, seed=6)
+    for deadline_s in (None, 60):
+        instance = solver.LogisticsSolver(df, local_search_budget=0.05, profile=True)
+        list(instance.solve_iter(top_k=1, deadline_s=deadline_s))
+        report = instance.profile_report
+        phases = {p['phase']: p for p in report.phases}
+        # Tur lokal dibangun di solve_iter (sebelum / di antara rekursi) tetap tercatat
+        assert phases['stage_tours']['calls'] >= 3
+        assert report.counters['tsp_calls'] == (3 if deadline_s is None else 6)
+        assert sum(p['wall_s'] for p in report.phases) <= report.total_s
+        assert report.total_s >= 0.5 * instance.last_solve_s
+
+def test_node_lookups_counted_only_when_profiling():
+    df = generate_scenario(n_stages=3, nodes_per_stage=30, seed=6)
+    plain = solver.LogisticsSolver(df, local_search_budget=0)
+    profiled = solver.LogisticsSolver(df, local_search_budget=0, profile=True)
+    expected = plain.get_recommendations(top_k=3)
+    results = profiled.get_recommendations(top_k=3)
+    assert type(plain.nodes) is solver.NodeStore
+    assert [r['total_cost'] for r in results] == [r['total_cost'] for r in expected]
+    # Setidaknya satu lookup per node di setiap full_path yang dimaterialisasi
+    assert profiled.profile_report.counters['node_lookups'] >= sum(len(r['full_path']) for r in results)
@@ -0,0 +1,40 @@
+import numpy as np
+
+import solver
+from scenario_generator import generate_scenario
+
+def test_candidate_greedy_matches_full_scan():
+    rng = np.random.default_rng(1)
+    cost = rng.uniform(1, 100, (80, 80))
+    cost[rng.random(cost.shape) < 0.2] = np.inf # leg tertutup
+    nbrs = np.argsort(cost + np.diag(np.full(80, np.inf)), axis=1, kind='stable')[:, :6]
+    full = solver.batched_greedy_open_paths(cost)
+    pruned = solver.batched_greedy_open_paths(cost, candidates=nbrs)
+    assert np.array_equal(full[1], pruned[1])
+    assert np.array_equal(full[0], pruned[0])
+    assert pruned[3] < full[3]
+
+def test_spatial_index_stage_tours_match_batched_greedy():
+    instance = solver.LogisticsSolver(generate_scenario(n_stages=1, nodes_per_stage=150, seed=4), local_search_budget=0)
+    positions, sub_cost = instance.stage_cost(1)
+    coords = (instance.nodes.lat[positions], instance.nodes.lon[positions])
+    plain = solver.heuristic_stage_tours(1, positions, sub_cost, 0, 8)
+    indexed = solver.heuristic_stage_tours(1, positions, sub_cost, 0, 8, coords=coords)
+    assert indexed.method == 'greedy(spatial-index)'
+    assert np.array_equal(plain.cost, indexed.cost)
+    assert np.array_equal(plain.paths, indexed.paths)
+
+def test_local_search_parallel_matches_serial():
+    # Local search dibatasi jumlah evaluasi move (bukan jam) -> serial dan paralel identik
+    df = generate_scenario(n_stages=3, nodes_per_stage=[5, 60, 40], seed=2)
+    serial = solver.LogisticsSolver(df, local_search_budget=0.05)
+    parallel = solver.LogisticsSolver(df, local_search_budget=0.05, workers=2)
+    expected = serial.get_recommendations(top_k=3)
+    results = parallel.get_recommendations(top_k=3)
+    assert [r['total_cost'] for r in results] == [r['total_cost'] for r in expected]
+    assert [[n['id'] for n in r['full_path']] for r in results] == [[n['id'] for n in r['full_path']] for r in expected]
+    for stage in serial.stages:
+        assert np.array_equal(serial.stage_tours[stage].cost, parallel.stage_tours[stage].cost)
+        if serial.stage_tours[stage].paths is not None:
+            assert np.array_equal(serial.stage_tours[stage].paths, parallel.stage_tours[stage].paths)
+            assert np.array_equal(serial.stage_tours[stage].exits, parallel.stage_tours[stage].exits)
@@ -0,0 +1,207 @@
+import os
+
+import numpy as np
+
+TRACE_OFF, TRACE_DECISIONS, TRACE_FULL = 'off', 'decisions', 'full'
+TRACE_LEVELS = (TRACE_OFF, TRACE_DECISIONS, TRACE_FULL)
+
+# Jenis record: keputusan DP (1 per state) dan kandidat (semua pasangan entry x exit, level full)
+KIND_BASE, KIND_RECURSIVE, KIND_FINAL, KIND_CANDIDATE = 0, 1, 2, 3
+DECISION_KINDS = (KIND_BASE, KIND_RECURSIVE, KIND_FINAL)
+
+# Record numerik ringkas; node/exit/next = posisi di NodeStore (-1 = tidak ada)
+TRACE_DTYPE = np.dtype([
+    ('kind', np.int8), ('stage', np.int32),
+    ('node', np.int64), ('exit', np.int64), ('next', np.int64),
+    ('local', np.float64), ('transit', np.float64), ('future', np.float64), ('total', np.float64),
+])
+
+class TraceLog:
+    """
+    Jejak perhitungan DP dalam bentuk record numerik (TRACE_DTYPE), dirender ke teks
+    hanya saat diminta UI. Buffer berukuran tetap (ring): jika spill_path diisi, buffer
+    penuh ditulis ke disk; jika tidak, record tertua ditimpa (dihitung di `dropped`).
+    """
+    def __init__(self, level=TRACE_DECISIONS, capacity=100_000, spill_path=None):
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Level trace tidak dikenal: {level} (pilihan: {', '.join(TRACE_LEVELS)})")
+        self.level = level
+        self.capacity = max(int(capacity), 1)
+        self.spill_path = spill_path
+        self.clear()
+
+    @property
+    def enabled(self):
+        return self.level != TRACE_OFF
+
+    @property
+    def full(self):
+        return self.level == TRACE_FULL
+
+    def clear(self):
+        self._buffer = np.empty(0, dtype=TRACE_DTYPE) # tumbuh (x2) sampai capacity
+        self._count = 0 # total record yang pernah ditulis (seq berikutnya)
+        self._first = 0 # seq tertua yang masih ada di buffer memori
+        self._spilled = 0 # jumlah record di file spill (seq 0 .. _spilled-1)
+        self.dropped = 0
+        self._index = None
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+
+    def __len__(self):
+        return self._count - self._first + self._spilled
+
+    def append(self, kind, stage, node, exit=-1, next=-1, local=0.0, transit=0.0, future=0.0, total=0.0):
+        # Semua argumen boleh skalar atau array (satu panggilan per stage, bukan per entry)
+        if not self.enabled:
+            return
+        cols = np.broadcast_arrays(kind, stage, node, exit, next, local, transit, future, total)
+        n = cols[0].size
+        if n == 0:
+            return
+        batch = np.empty(n, dtype=TRACE_DTYPE)
+        for name, col in zip(TRACE_DTYPE.names, cols):
+            batch[name] = col.ravel()
+        self._index = None
+        need = min(self._count - self._first + n, self.capacity)
+        if need > len(self._buffer):
+            # Belum pernah wrap (buffer < capacity) -> data masih kontigu mulai slot 0
+            grown = np.empty(min(max(need, 2 * len(self._buffer)), self.capacity), dtype=TRACE_DTYPE)
+            grown[:len(self._buffer)] = self._buffer
+            self._buffer = grown
+        start = 0
+        while start < n:
+            if self._count - self._first == self.capacity:
+                self._evict(n - start)
+            slot = self._count % self.capacity
+            take = min(n - start, self.capacity - slot, self.capacity - (self._count - self._first))
+            self._buffer[slot:slot + take] = batch[start:start + take]
+            self._count += take
+            start += take
+
+    def _evict(self, incoming):
+        if self.spill_path:
+            # Buffer penuh -> tulis berurutan ke disk, memori dipakai ulang dari awal
+            with open(self.spill_path, 'ab') as f:
+                self._ordered_buffer().tofile(f)
+            self._spilled += self._count - self._first
+            self._first = self._count
+        else:
+            drop = min(incoming, self.capacity)
+            self._first += drop
+            self.dropped += drop
+
+    def _ordered_buffer(self):
+        idx = np.arange(self._first, self._count) % self.capacity
+        return self._buffer[idx]
+
+    def records(self):
+        # Semua record yang masih tersedia, urut seq (file spill + buffer memori)
+        parts = []
+        if self._spilled:
+            parts.append(np.fromfile(self.spill_path, dtype=TRACE_DTYPE, count=self._spilled))
+        parts.append(self._ordered_buffer())
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def slice(self, start, stop):
+        # Record ke-start .. stop-1 (urutan records()) tanpa memuat seluruh trace (paging UI)
+        parts = []
+        if start < self._spilled:
+            spilled = np.memmap(self.spill_path, dtype=TRACE_DTYPE, mode='r', shape=(self._spilled,))
+            parts.append(np.array(spilled[start:min(stop, self._spilled)]))
+        lo = max(start - self._spilled, 0)
+        hi = min(max(stop - self._spilled, 0), self._count - self._first)
+        if lo < hi:
+            parts.append(self._buffer[(self._first + np.arange(lo, hi)) % self.capacity])
+        if not parts:
+            return np.empty(0, dtype=TRACE_DTYPE)
+        return np.concatenate(parts) if len(parts) > 1 else parts[0]
+
+    def count(self, kinds=None):
+        # Jumlah record (opsional: hanya jenis tertentu), dihitung per potongan
+        if kinds is None:
+            return len(self)
+        return sum(len(chunk) for chunk in self.iter_records(kinds=kinds))
+
+    def iter_records(self, chunk_rows=65_536, kinds=None):
+        """
+        Record urut seq per potongan: file spill dibaca lewat memmap (tidak dimuat penuh), lalu
+        buffer memori. kinds: filter jenis record (mis. DECISION_KINDS), None = semua.
+        """
+        sources = []
+        if self._spilled:
+            sources.append(np.memmap(self.spill_path, dtype=TRACE_DTYPE, mode='r', shape=(self._spilled,)))
+        sources.append(self._ordered_buffer())
+        for source in sources:
+            for lo in range(0, len(source), chunk_rows):
+                chunk = np.array(source[lo:lo + chunk_rows])
+                if kinds is not None:
+                    chunk = chunk[np.isin(chunk['kind'], kinds)]
+                if len(chunk):
+                    yield chunk
+
+    def record(self, seq):
+        if seq >= self._first:
+            return self._buffer[seq % self.capacity]
+        if seq < self._spilled:
+            return np.memmap(self.spill_path, dtype=TRACE_DTYPE, mode='r', shape=(self._spilled,))[seq].copy()
+        return None # sudah tertimpa ring buffer
+
+    def _build_index(self):
+        # (stage, node) -> seq record keputusan; untuk start (KIND_FINAL) simpan yang termurah
+        recs = self.records()
+        seqs = np.arange(self._count - len(recs), self._count)
+        index, best = {}, {}
+        decision = np.isin(recs['kind'], DECISION_KINDS)
+        for rec, seq in zip(recs[decision], seqs[decision]):
+            key = (int(rec['stage']), int(rec['node']))
+            if rec['kind'] == KIND_FINAL and key in best and best[key] <= rec['total']:
+                continue
+            index[key] = int(seq)
+            best[key] = rec['total']
+        self._index = index
+
+    def lookup(self, stage, node):
+        if self._index is None:
+            self._build_index()
+        seq = self._index.get((int(stage), int(node)))
+        return None if seq is None else self.record(seq)
+
+    def retain(self, stages, remap=None):
+        # Simpan hanya record stage tertentu (solve inkremental); remap: posisi lama -> posisi baru
+        recs = self.records()
+        recs = recs[np.isin(recs['stage'], list(stages))]
+        if remap is not None and len(recs):
+            for col in ('node', 'exit', 'next'):
+                valid = recs[col] >= 0
+                recs[col][valid] = remap[recs[col][valid]]
+        self.clear()
+        self.append(*(recs[name] for name in TRACE_DTYPE.names))
+
+    def render(self, rec, nodes):
+        # Record numerik -> dict teks (format sama dengan log lama: stage/type/node/detail/math)
+        kind, stage = int(rec['kind']), int(rec['stage'])
+        name = nodes.names[rec['node']]
+        local, transit, future, total = rec['local'], rec['transit'], rec['future'], rec['total']
+        if kind == KIND_BASE:
+            return {"stage": stage, "type": "Base Calculation", "node": name,
+                    "detail": f"Menghitung biaya internal di Stage {stage}. Sisa biaya ke depan = 0.",
+                    "math": f"Biaya Lokal ({local:,.0f}) + Future (0) = {total:,.0f}"}
+        next_name = nodes.names[rec['next']]
+        next_stage = nodes.stages[rec['next']].item()
+        if kind == KIND_FINAL:
+            return {"stage": stage, "type": "Final Decision", "node": f"{name} (Start)",
+                    "detail": f"Memilih masuk ke **{next_name}** sebagai pintu gerbang Stage {next_stage}.",
+                    "math": f"Transport Awal ({transit:,.0f}) + Sisa Rute ({future:,.0f}) = **{total:,.0f}**"}
+        math_str = f"Lokal ({local:,.0f}) + Transisi ({transit:,.0f}) + Future ({future:,.0f}) = **{total:,.0f}**"
+        if kind == KIND_CANDIDATE:
+            return {"stage": stage, "type": "Candidate", "node": name,
+                    "detail": f"Alternatif dari {name}: keluar di {nodes.names[rec['exit']]}, lanjut ke {next_name} (Stage {next_stage}).",
+                    "math": math_str}
+        return {"stage": stage, "type": "Recursive Decision", "node": name,
+                "detail": f"Dari {name}, rute termurah adalah menuju **{next_name}** (Stage {next_stage}).",
+                "math": math_str}
+
+    def render_all(self, nodes, kinds=DECISION_KINDS):
+        recs = self.records()
+        return [self.render(rec, nodes) for rec in recs[np.isin(recs['kind'], kinds)]]